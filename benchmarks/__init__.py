@@ -0,0 +1,8 @@
+"""
+Performance benchmarks for firanka. These are not unit tests - run them by hand, like:
+
+    python -m benchmarks.bench_lookup
+
+benchmarks.suite runs all core operations at growing sizes, and can save and
+compare results between versions.
+"""
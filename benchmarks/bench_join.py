@@ -0,0 +1,40 @@
+"""
+Joining two discrete series of a million points each.
+
+    python -m benchmarks.bench_join [size]
+"""
+import sys
+import time
+
+from firanka.series import DiscreteSeries, ArrayDiscreteSeries
+from firanka.series.array import np
+
+
+def timed(fun):
+    started = time.perf_counter()
+    fun()
+    return time.perf_counter() - started
+
+
+def main(size=int(1e6)):
+    a = DiscreteSeries([(i * 2, i % 7) for i in range(size)])
+    b = DiscreteSeries([(i * 2 + 1, i % 5) for i in range(size)])
+
+    print('DiscreteSeries: %.3f s' % timed(
+        lambda: a.join_discrete(b, lambda t, x, y: x + y)))
+
+    if np is None:
+        print('numpy not installed, skipping ArrayDiscreteSeries')
+        return
+
+    a = ArrayDiscreteSeries.from_series(a)
+    b = ArrayDiscreteSeries.from_series(b)
+
+    print('ArrayDiscreteSeries: %.3f s' % timed(
+        lambda: a.join_discrete(b, lambda t, x, y: x + y)))
+    print('ArrayDiscreteSeries, vectorized: %.3f s' % timed(
+        lambda: a.join_discrete(b, lambda t, x, y: x + y, vectorized=True)))
+
+
+if __name__ == '__main__':
+    main(*[int(float(arg)) for arg in sys.argv[1:]])
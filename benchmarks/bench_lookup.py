@@ -0,0 +1,45 @@
+"""
+Point lookup cost on a DiscreteSeries as it grows.
+
+Lookup is a binary search, so the time per lookup should stay (roughly) flat
+from 1e3 to 1e7 points. Lookups through unchecked() skip the domain check.
+
+    python -m benchmarks.bench_lookup [max_size]
+"""
+import random
+import sys
+import timeit
+
+from firanka.series import DiscreteSeries
+
+LOOKUPS = 100000
+
+
+def bench(size):
+    series = DiscreteSeries([(i, i) for i in range(size)])
+    points = [random.uniform(0, size - 1) for _ in range(LOOKUPS)]
+
+    def run():
+        for p in points:
+            series[p]
+
+    def run_unchecked():
+        get = series.unchecked()
+        for p in points:
+            get(p)
+
+    return [min(timeit.repeat(fun, number=1, repeat=3)) / LOOKUPS
+            for fun in (run, run_unchecked)]
+
+
+def main(max_size=int(1e7)):
+    size = 1000
+    while size <= max_size:
+        checked, unchecked = bench(size)
+        print('%10d points: %8.3f us/lookup, %8.3f us unchecked'
+              % (size, checked * 1e6, unchecked * 1e6))
+        size *= 10
+
+
+if __name__ == '__main__':
+    main(*[int(float(arg)) for arg in sys.argv[1:]])
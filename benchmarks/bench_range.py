@@ -0,0 +1,62 @@
+"""
+Range min/max queries on a DiscreteSeries, against scanning the range.
+
+The sparse table is built on first query, in O(n log n) time and memory - the
+build time and peak memory are reported separately. Queries then take constant
+time, apart from two binary searches.
+
+    python -m benchmarks.bench_range [max_size]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from firanka.intervals import Interval
+from firanka.series import DiscreteSeries, ArrayDiscreteSeries
+from firanka.series.array import np
+
+QUERIES = 10000
+
+
+def timed(fun):
+    started = time.perf_counter()
+    fun()
+    return time.perf_counter() - started
+
+
+def bench(series, windows):
+    tracemalloc.start()
+    build = timed(lambda: series._sparse_table('max'))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    query = timed(lambda: [series.max(w) for w in windows]) / len(windows)
+    return build, peak, query
+
+
+def main(max_size=int(1e6)):
+    size = 1000
+    while size <= max_size:
+        data = [(i, random.random()) for i in range(size)]
+        windows = []
+        for _ in range(QUERIES):
+            start = random.uniform(0, size - 1)
+            windows.append(Interval(start, random.uniform(start, size - 1), True, True))
+
+        series = DiscreteSeries(data)
+        scan = timed(lambda: [max(v for k, v in series[w].optimize().data)
+                              for w in windows[:100]]) / 100
+        build, peak, query = bench(series, windows)
+        print('%10d points: build %8.3f s, %8.1f MB, %7.3f us/query, scan %9.3f us/query'
+              % (size, build, peak / 2 ** 20, query * 1e6, scan * 1e6))
+
+        if np is not None:
+            build, peak, query = bench(ArrayDiscreteSeries.from_series(series), windows)
+            print('%10s   array: build %8.3f s, %8.1f MB, %7.3f us/query'
+                  % ('', build, peak / 2 ** 20, query * 1e6))
+        size *= 10
+
+
+if __name__ == '__main__':
+    main(*[int(float(arg)) for arg in sys.argv[1:]])
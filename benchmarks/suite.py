@@ -0,0 +1,182 @@
+"""
+Scaling benchmarks of core operations, reporting time and peak memory.
+
+    python -m benchmarks.suite [--min-size 1e2] [--max-size 1e7] [--save FILE]
+                               [--compare FILE] [benchmark ...]
+
+Every benchmark runs at sizes from min-size to max-size, growing tenfold. Time is
+the best of --repeat runs, and peak memory is what tracemalloc saw allocated during
+one more run (so it does not slow the timed ones down). Setup is excluded from both.
+
+Results can be saved as JSON, and compared against saved ones - with ratios
+printed next to each result, so that regressions stand out.
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from firanka.builders import DiscreteSeriesBuilder
+from firanka.series import DiscreteSeries, DiscreteSeriesBundle, \
+    LinearInterpolationSeries, ModuloSeries
+
+LOOKUPS = 10000  # for benchmarks of single lookups
+
+
+def _data(size, step=1):
+    return [(i * step, random.random()) for i in range(size)]
+
+
+def _points(size, stop):
+    return [random.uniform(0, stop) for _ in range(size)]
+
+
+# Each benchmark takes a size, does its setup and returns (callable to measure,
+# amount of items it processes).
+
+def construct(size):
+    data = _data(size)
+    return lambda: DiscreteSeries(data), size
+
+
+def lookup(size):
+    series = DiscreteSeries(_data(size))
+    points = _points(LOOKUPS, size - 1)
+
+    def run():
+        for p in points:
+            series[p]
+
+    return run, LOOKUPS
+
+
+def eval_points(size):
+    series = DiscreteSeries(_data(size))
+    points = _points(size, size - 1)
+    return lambda: series.eval_points(points), size
+
+
+def discretize(size):
+    series = DiscreteSeries(_data(size))
+    points = _points(size, size - 1)
+    return lambda: series.discretize(points), size
+
+
+def join_discrete(size):
+    a = DiscreteSeries(_data(size, 2))
+    b = DiscreteSeries([(k + 1, v) for k, v in _data(size, 2)])
+    return lambda: a.join_discrete(b, lambda t, x, y: x + y), 2 * size
+
+
+def compose(size):
+    bundle = DiscreteSeriesBundle(*[DiscreteSeries(_data(size, 3)) for _ in range(3)])
+    return bundle.compose, 3 * size
+
+
+def builder(size):
+    series = DiscreteSeries(_data(size))
+
+    def run():
+        kb = DiscreteSeriesBuilder(series)
+        for i in range(LOOKUPS):
+            kb.put(size + i, i)
+            kb.as_series()
+        kb.put(size / 2 + 0.5, 0)  # one correction, which copies the storage once
+        kb.as_series()
+
+    return run, LOOKUPS
+
+
+def interpolation_lookup(size):
+    series = LinearInterpolationSeries(_data(size))
+    points = _points(LOOKUPS, size - 1)
+
+    def run():
+        for p in points:
+            series[p]
+
+    return run, LOOKUPS
+
+
+def modulo_eval_points(size):
+    series = ModuloSeries(DiscreteSeries(_data(size), '<0;%s)' % (size,)))
+    points = _points(size, 100 * size)
+    return lambda: series.eval_points(points), size
+
+
+def rolling(size):
+    series = DiscreteSeries(_data(size))
+    return lambda: series.rolling(100, 'max'), size
+
+
+BENCHMARKS = [construct, lookup, eval_points, discretize, join_discrete, compose,
+              builder, interpolation_lookup, modulo_eval_points, rolling]
+
+
+def measure(benchmark, size, repeat):
+    """:return: a tuple of (best time in seconds, peak memory in bytes, items)"""
+    fun, items = benchmark(size)
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fun()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    fun()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return best, peak, items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help='benchmarks to run, all by default: %s'
+                             % (', '.join(b.__name__ for b in BENCHMARKS),))
+    parser.add_argument('--min-size', type=float, default=1e2)
+    parser.add_argument('--max-size', type=float, default=1e7)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', metavar='FILE', help='save results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='compare with saved results')
+    args = parser.parse_args()
+
+    benchmarks = {b.__name__: b for b in BENCHMARKS}
+    for name in args.benchmarks:
+        if name not in benchmarks:
+            parser.error('unknown benchmark %s' % (name,))
+    names = args.benchmarks or [b.__name__ for b in BENCHMARKS]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    random.seed(0)
+    results = {}
+    for name in names:
+        size = int(args.min_size)
+        while size <= args.max_size:
+            key = '%s/%d' % (name, size)
+            took, peak, items = measure(benchmarks[name], size, args.repeat)
+            results[key] = {'time': took, 'peak': peak}
+
+            line = '%-32s %10.4f s %10.3f us/item %10.1f MB' % (
+                key, took, took / items * 1e6, peak / 2 ** 20)
+            if key in baseline:
+                line += '   time x%.2f, memory x%.2f' % (
+                    took / baseline[key]['time'],
+                    peak / max(baseline[key]['peak'], 1))
+            print(line, flush=True)
+            size *= 10
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,11 @@
-import copy
-
-from sortedcontainers import SortedList
+import bisect
+import functools
+import math
+import weakref
 
+from .intervals import Interval, EMPTY_SET
 from .series import DiscreteSeries
+from .series.base import _Window
 
 """
 Update knowledge of current discrete series
@@ -10,11 +13,25 @@ Update knowledge of current discrete series
 
 __all__ = [
     'DiscreteSeriesBuilder',
+    'MaintainedJoin',
 ]
 
 
 class DiscreteSeriesBuilder(object):
-    def __init__(self, series=None):
+    """
+    Putting points past the last one is just an append. Points put in between are
+    kept aside and merged in on the next as_series().
+
+    Series returned by as_series() share the builder's storage, so as_series() costs
+    nothing unless some points were put in between - then the storage gets copied once.
+    """
+
+    def __init__(self, series=None, integral_index=False):
+        """
+        :param series: a DiscreteSeries to start with
+        :param integral_index: whether to maintain the index used by integrate() and
+            mean() of returned series. It's updated only for points that changed.
+        """
 
         if series is None:
             series = DiscreteSeries([])
@@ -22,31 +39,192 @@ class DiscreteSeriesBuilder(object):
         if not isinstance(series, DiscreteSeries):
             raise TypeError(u'discrete knowledge builder supports only discrete series')
 
-        self.new_data = {}
         self.domain = series.domain
         self.series = series
 
+        self._data = list(series.data)
+        self._keys = [k for k, v in self._data]
+        self._corrections = {}  # index => value, for points put before the last one
+        self._shared = False  # is the storage referenced by a returned series?
+        self._areas = [] if integral_index else None  # as in DiscreteSeries._areas
+        self._watchers = []  # weakrefs to callables(index), called on each put()
+
     def put(self, index, value):
         self.domain = self.domain.extend_to_point(index)
-        self.new_data[index] = value
+        for ref in self._watchers:
+            watcher = ref()
+            if watcher is not None:
+                watcher(index)
+
+        if len(self._keys) == 0 or index > self._keys[-1]:
+            self._keys.append(index)
+            self._data.append((index, value))
+        else:
+            self._corrections[index] = value
+
+    def _apply_corrections(self):
+        corrections = sorted(self._corrections.items())
+        self._corrections = {}
+
+        if self._areas is not None:  # invalidate integrals past the first correction
+            first = bisect.bisect_left(self._keys, corrections[0][0])
+            if self._shared:
+                self._areas = self._areas[:first]
+            else:
+                del self._areas[first:]
+
+        # a single merge pass - copying is needed anyway if somebody sees the storage,
+        # and splicing corrections in one by one would move the tail for each of them
+        old_data, old_keys, data, keys, i = self._data, self._keys, [], [], 0
+        for k, v in corrections:
+            j = bisect.bisect_left(old_keys, k, i)
+            data.extend(old_data[i:j])
+            keys.extend(old_keys[i:j])
+            data.append((k, v))
+            keys.append(k)
+            i = bisect.bisect_right(old_keys, k, j)
+        data.extend(old_data[i:])
+        keys.extend(old_keys[i:])
+
+        self._data = data
+        self._keys = keys
+        self._shared = False
 
     def as_series(self):
         """
         Update
         :return: a new DiscreteSeries instance
         """
+        if len(self._corrections) > 0:
+            self._apply_corrections()
+
+        self._shared = True
+        n = len(self._data)
+        series = DiscreteSeries._from_sorted(_Window(self._data, 0, n),
+                                             _Window(self._keys, 0, n),
+                                             self.domain)
+
+        if self._areas is not None:
+            areas = self._areas
+            for i in range(len(areas), n):
+                if i == 0:
+                    areas.append(0)
+                else:
+                    (prev_k, prev_v), k = self._data[i - 1], self._keys[i]
+                    areas.append(areas[-1] + prev_v * (k - prev_k))
+            series._areas = _Window(areas, 0, n)
+
+        return series
+
+
+def _unwatch(watchers, ref):
+    if ref in watchers:
+        watchers.remove(ref)
+
+
+class MaintainedJoin(object):
+    """
+    A join_discrete() of two series, one or both of which are being built by
+    DiscreteSeriesBuilders, kept up to date as points are put.
+
+    as_series() recomputes the join only from the earliest index put since it was
+    last called on, or from where the join ended if none were put before that. Like
+    DiscreteSeriesBuilder.as_series(), it returns series sharing the storage of the
+    join, which gets copied only if points already returned have to change.
+    """
+
+    def __init__(self, left, right, fun):
+        """
+        :param left: a DiscreteSeriesBuilder, or a DiscreteSeries
+        :param right: a DiscreteSeriesBuilder, or a DiscreteSeries
+        :param fun: callable(t: float, v1, v2) -> value, as in join_discrete()
+        :raise TypeError: a series is not a stepwise DiscreteSeries
+        """
+        for side in (left, right):
+            if not isinstance(side, DiscreteSeriesBuilder) and \
+                    (not isinstance(side, DiscreteSeries) or not side._stepwise):
+                raise TypeError(u'only builders and stepwise discrete series can be joined')
+        # weakly, so that builders do not keep joins nobody uses alive
+        self._watching = []  # tuples of (builder, weakref in its _watchers)
+        for side in (left, right):
+            if isinstance(side, DiscreteSeriesBuilder):
+                ref = weakref.WeakMethod(self._touched,
+                                         functools.partial(_unwatch, side._watchers))
+                side._watchers.append(ref)
+                self._watching.append((side, ref))
 
-        new_data = SortedList()
-        cp_new_data = copy.copy(self.new_data)
+        self.left = left
+        self.right = right
+        self.fun = fun
+        self.domain = EMPTY_SET
+
+        self._data = []
+        self._keys = []
+        self._dirty = -math.inf  # earliest index put since last update, None if none
+        self._shared = False  # is the storage referenced by a returned series?
+
+    def close(self):
+        """
+        Stop following the builders. as_series() will keep returning the join as it
+        was last computed.
+        """
+        for builder, ref in self._watching:
+            _unwatch(builder._watchers, ref)
+        self._watching = []
+        self._dirty = None
 
-        # Update - series.data is sorted, so no worries :)
-        for k, v in self.series.data:
-            if k in cp_new_data:
-                v = cp_new_data.pop(k)
-            new_data.add((k, v))
+    def _touched(self, index):
+        if self._dirty is None or index < self._dirty:
+            self._dirty = index
 
-        # Add those that remained
-        for k, v in cp_new_data.items():
-            new_data.add((k, v))
+    def _update(self):
+        left, right = [side.as_series() if isinstance(side, DiscreteSeriesBuilder) else side
+                       for side in (self.left, self.right)]
+        previous, domain = self.domain, left.domain.intersection(right.domain)
+        self.domain = domain
+        start, self._dirty = self._dirty, None
+
+        if domain.is_empty():
+            keep = 0
+        elif len(self._keys) == 0 or self._keys[0] != domain.start:
+            start, keep = domain.start, 0  # start of the join moved, recompute all of it
+        elif start <= previous.stop:
+            start = max(start, domain.start)
+            keep = bisect.bisect_left(self._keys, start)
+        else:  # nothing joined so far changed, but the other series might have been
+            # longer, so the join grows from where it ended
+            start = previous.stop
+            keep = bisect.bisect_right(self._keys, start)
+
+        if keep < len(self._data):  # only truncating changes what was returned
+            if self._shared:
+                self._data, self._keys = self._data[:keep], self._keys[:keep]
+                self._shared = False
+            else:
+                del self._data[keep:]
+                del self._keys[keep:]
+
+        if domain.is_empty() or start > domain.stop or \
+                (start == domain.stop and not domain.right_inc):
+            return
+
+        tail = Interval(start, domain.stop, True, domain.right_inc)
+        joined = left._view(tail)._join_discrete_other_discrete(right._view(tail), self.fun)
+        for k, v in joined.data:
+            if len(self._data) > 0 and self._data[-1][1] == v:
+                continue
+            self._data.append((k, v))
+            self._keys.append(k)
+
+    def as_series(self):
+        """
+        :return: a DiscreteSeries, the join of current versions of both series
+        """
+        if self._dirty is not None:
+            self._update()
 
-        return DiscreteSeries(new_data, self.domain)
+        self._shared = True
+        n = len(self._data)
+        return DiscreteSeries._from_sorted(_Window(self._data, 0, n),
+                                           _Window(self._keys, 0, n),
+                                           self.domain)
@@ -1,15 +1,34 @@
 
 import math
 import functools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from .exceptions import NotInDomainError
 
 __all__ = [
     'Interval',
+    'IntervalArray',
     'REAL_SET',
     'EMPTY_SET'
 ]
 
 
+@functools.lru_cache(maxsize=1024)
+def _parse(rs):
+    """Parse a string representation of an interval into its arguments. Cached."""
+    if rs[0] not in '<(': raise ValueError(
+        'Must start with ( or <')
+    if rs[-1] not in '>)': raise ValueError('Must end with ) or >')
+    if ';' not in rs: raise ValueError('Separator ; required')
+
+    start, stop = rs[1:-1].split(';')
+    return float(start), float(stop), rs[0] == '<', rs[-1] == '>'
+
+
 def _pre_range(fun):  # for making sure that first argument gets parsed as a Interval
     @functools.wraps(fun)
     def inner(self, arg, *args, **kwargs):
@@ -70,15 +89,6 @@ class Interval(object):
     def __fromrange(self, rs):
         return rs.start, rs.stop, rs.left_inc, rs.right_inc
 
-    def __fromstr(self, rs):
-        if rs[0] not in '<(': raise ValueError(
-            'Must start with ( or <')
-        if rs[-1] not in '>)': raise ValueError('Must end with ) or >')
-        if ';' not in rs: raise ValueError('Separator ; required')
-
-        start, stop = rs[1:-1].split(';')
-        return float(start), float(stop), rs[0] == '<', rs[-1] == '>'
-
     def __getargs(self, args):
         if len(args) == 1:
             rs, = args
@@ -87,7 +97,7 @@ class Interval(object):
             elif isinstance(rs, slice):
                 args = self.__fromslice(rs)
             else:
-                args = self.__fromstr(rs)
+                args = _parse(rs)
         elif len(args) == 2:
             a, b = args
             args = a, b, not math.isinf(a), not math.isinf(b)
@@ -219,3 +229,163 @@ class Interval(object):
 
 EMPTY_SET = Interval(0, 0, False, False)
 REAL_SET = Interval(float('-inf'), float('+inf'), False, False)
+
+
+def _contains_points(start, stop, left_inc, right_inc, x):
+    """Interval._contains_point, over arrays"""
+    return np.where(x == start, left_inc,
+                    np.where(x == stop, right_inc, (start < x) & (x < stop)))
+
+
+class IntervalArray(object):
+    """
+    Many intervals, kept as parallel arrays of starts, stops, and whether they are
+    left- and right-closed. Operations work on all of them at once. Immutable.
+
+    Requires NumPy.
+    """
+    __slots__ = ('start', 'stop', 'left_inc', 'right_inc')
+
+    def __init__(self, start, stop, left_inc=None, right_inc=None):
+        """
+        Arguments are broadcast against each other. If left_inc or right_inc are not
+        given, sides are closed unless they are infinite - as in Interval(a, b).
+
+        :raise ValueError: a side is closed, but infinite
+        :raise ImportError: NumPy is not installed
+        """
+        if np is None:
+            raise ImportError(u'IntervalArray requires numpy')
+
+        start = np.asarray(start, dtype=np.float64)
+        stop = np.asarray(stop, dtype=np.float64)
+        left_inc = ~np.isinf(start) if left_inc is None else np.asarray(left_inc, dtype=bool)
+        right_inc = ~np.isinf(stop) if right_inc is None else np.asarray(right_inc, dtype=bool)
+        start, stop, left_inc, right_inc = [np.atleast_1d(a) for a in np.broadcast_arrays(
+            start, stop, left_inc, right_inc)]
+
+        if np.any(left_inc & np.isinf(start)) or np.any(right_inc & np.isinf(stop)):
+            raise ValueError('Set with sharp closing but infinity set')
+
+        self.start, self.stop, self.left_inc, self.right_inc = start, stop, left_inc, right_inc
+
+    @classmethod
+    def from_intervals(cls, intervals):
+        """
+        :param intervals: iterable of Intervals, or anything Interval() accepts
+        """
+        intervals = [i if isinstance(i, Interval) else Interval(i) for i in intervals]
+        return cls([i.start for i in intervals], [i.stop for i in intervals],
+                   [i.left_inc for i in intervals], [i.right_inc for i in intervals])
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self, item):
+        """
+        :param item: a position, or anything numpy can index an array with
+        :return: an Interval for a position, else an IntervalArray
+        """
+        if isinstance(item, (int, np.integer)):
+            return Interval(self.start[item].item(), self.stop[item].item(),
+                            bool(self.left_inc[item]), bool(self.right_inc[item]))
+        return IntervalArray(self.start[item], self.stop[item],
+                             self.left_inc[item], self.right_inc[item])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return 'IntervalArray(%s)' % (', '.join(str(i) for i in self),)
+
+    def is_empty(self):
+        """:return: a bool array"""
+        return (self.start == self.stop) & ~(self.left_inc | self.right_inc)
+
+    def length(self):
+        return self.stop - self.start
+
+    def translate(self, x):
+        """
+        :param x: a number, or an array of them - one for each interval
+        """
+        return IntervalArray(self.start + x, self.stop + x, self.left_inc, self.right_inc)
+
+    def contains(self, points):
+        """
+        Check whether points are in intervals. Points are broadcast against intervals,
+        so pass a number to check it against every interval, as many points as there
+        are intervals to check them pairwise, or points[:, None] to check every point
+        against every interval.
+
+        :return: a bool array
+        """
+        return _contains_points(self.start, self.stop, self.left_inc, self.right_inc,
+                                np.asarray(points, dtype=np.float64))
+
+    def intersection(self, other):
+        """
+        Intersect intervals pairwise, as Interval.intersection does.
+
+        :param other: an IntervalArray of the same length, or an Interval (or its string
+            representation) to intersect every interval with
+        :return: a new IntervalArray. Empty intersections are EMPTY_SET.
+        """
+        if not isinstance(other, IntervalArray):
+            if not isinstance(other, Interval):
+                other = Interval(other)
+            other = IntervalArray(other.start, other.stop, other.left_inc, other.right_inc)
+
+        # order each pair, so that a starts no later than b
+        swap = self.start > other.start
+        a = [np.where(swap, y, x) for x, y in zip(self._arrays(), other._arrays())]
+        b = [np.where(swap, x, y) for x, y in zip(self._arrays(), other._arrays())]
+        a_start, a_stop, a_left, a_right = a
+        b_start, b_stop, b_left, b_right = b
+
+        empty = (a_stop < b_start) | (b_stop < b_start) | (
+            (a_stop == b_start) & ~(a_right & b_left))
+
+        left_inc = np.where(a_start == b_start, a_left & b_left, b_left)
+        stop = np.minimum(a_stop, b_stop)
+        right_inc = np.where(a_stop == b_stop, a_right & b_right,
+                             np.where(a_stop < b_stop,
+                                      a_right & _contains_points(*(b + [a_stop])),
+                                      b_right & _contains_points(*(a + [b_stop]))))
+
+        return IntervalArray(np.where(empty, 0, b_start), np.where(empty, 0, stop),
+                             left_inc & ~empty, right_inc & ~empty)
+
+    def union(self):
+        """
+        Return the union of all intervals, as sorted, disjoint intervals that do not
+        touch each other. This takes a sort and a single pass.
+
+        :return: a new IntervalArray
+        """
+        # a point interval holds its point if it's left-closed, as in Interval
+        point = self.start == self.stop
+        keep = ~point | self.left_inc
+        start, stop, left_inc, right_inc = [a[keep] for a in self._arrays()]
+        right_inc = right_inc | point[keep]
+        order = np.lexsort((~left_inc, start))  # by start, closed ones first
+
+        merged = []
+        for s, e, l, r in zip(start[order].tolist(), stop[order].tolist(),
+                              left_inc[order].tolist(), right_inc[order].tolist()):
+            if merged and (s < merged[-1][1] or (s == merged[-1][1] and (merged[-1][3] or l))):
+                last = merged[-1]
+                if e > last[1]:
+                    last[1], last[3] = e, r
+                elif e == last[1]:
+                    last[3] = last[3] or r
+            else:
+                merged.append([s, e, l, r])
+
+        if not merged:
+            return IntervalArray([], [], [], [])
+        return IntervalArray(*zip(*merged))
+
+    def _arrays(self):
+        return [self.start, self.stop, self.left_inc, self.right_inc]
@@ -1,17 +1,25 @@
+from .array import ArrayDiscreteSeries, ArrayDiscreteSeriesBundle
 from .base import DiscreteSeries, Series
 from .bundle import SeriesBundle, DiscreteSeriesBundle
-from .function import FunctionSeries
+from .cached import CachedSeries
+from .compressed import CompressedDiscreteSeries
+from .function import AsyncFunctionSeries, FunctionSeries
 from .interpolations import LinearInterpolationSeries, \
     SCALAR_LINEAR_INTERPOLATOR
 from .modulo import ModuloSeries
 
 __all__ = [
     'FunctionSeries',
+    'AsyncFunctionSeries',
     'DiscreteSeries',
+    'ArrayDiscreteSeries',
+    'ArrayDiscreteSeriesBundle',
     'ModuloSeries',
     'Series',
     'LinearInterpolationSeries',
     'SCALAR_LINEAR_INTERPOLATOR',
     'SeriesBundle',
     'DiscreteSeriesBundle',
+    'CachedSeries',
+    'CompressedDiscreteSeries',
 ]
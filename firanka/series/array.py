@@ -0,0 +1,394 @@
+import collections.abc
+import functools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .base import DiscreteSeries, Series, _has_arguments, _AGGREGATES
+from .bundle import DiscreteSeriesBundle
+from ..exceptions import DomainError
+from ..intervals import Interval, EMPTY_SET
+
+__all__ = [
+    'ArrayDiscreteSeries',
+    'ArrayDiscreteSeriesBundle',
+]
+
+_CHUNK = 4096  # how many points to convert to Python objects at once
+
+
+def _asvalues(values):
+    """
+    Turn values into a 1-D array, numeric if possible, object otherwise.
+    Arrays that are already 1-D are not copied.
+    """
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        return values
+
+    values = list(values)
+    try:
+        arr = np.asarray(values)
+    except ValueError:  # ragged sequences and the like
+        arr = None
+
+    if arr is None or arr.ndim != 1 or arr.dtype.kind not in 'biufc':
+        arr = np.empty(len(values), dtype=object)
+        arr[:] = values
+    return arr
+
+
+class _ArrayData(collections.abc.Sequence):
+    """
+    Read-only view of parallel index and value arrays as a sequence of (index, value),
+    so that ArrayDiscreteSeries can be used wherever DiscreteSeries.data is expected.
+    """
+
+    def __init__(self, index, values):
+        self.index = index
+        self.values = values
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return list(zip(self.index[item].tolist(), self.values[item].tolist()))
+
+        if item < 0:
+            item += len(self.index)
+        if not 0 <= item < len(self.index):
+            raise IndexError('index out of range')
+        return self.index[item].item(), self.values[item:item + 1].tolist()[0]
+
+    def __iter__(self):
+        for i in range(0, len(self.index), _CHUNK):
+            yield from zip(self.index[i:i + _CHUNK].tolist(),
+                           self.values[i:i + _CHUNK].tolist())
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence) or len(self) != len(other):
+            return False
+        return all(a == tuple(b) for a, b in zip(self, other))
+
+    def __repr__(self):
+        return '_ArrayData(%s)' % (list(self),)
+
+
+class ArrayDiscreteSeries(DiscreteSeries):
+    """
+    A DiscreteSeries keeping its data in two NumPy arrays - a float64 index and values.
+
+    Values are kept in a numeric array if possible, else in an object one.
+    Arrays that are already of the right type are used without copying.
+
+    Requires NumPy.
+    """
+
+    def __init__(self, index, values, domain=None, *args, **kwargs):
+        """
+        :param index: sorted indices, anything convertible to a float64 array
+        :param values: values, as many as indices
+        :raise ValueError: index is not sorted, or lengths do not match
+        :raise ImportError: NumPy is not installed
+        """
+        if np is None:
+            raise ImportError(u'ArrayDiscreteSeries requires numpy')
+
+        index = np.asarray(index, dtype=np.float64)
+        values = _asvalues(values)
+
+        if index.ndim != 1 or len(index) != len(values):
+            raise ValueError(u'index and values must be 1-D and of the same length')
+        if np.any(index[1:] < index[:-1]):
+            raise ValueError(u'index must be sorted')
+
+        if len(index) == 0:
+            domain = EMPTY_SET
+        elif domain is None:
+            domain = Interval(index[0].item(), index[-1].item(), True, True)
+
+        self.index = index
+        self.values = values
+        self.data = _ArrayData(index, values)
+        self._keys = index
+        Series.__init__(self, domain, *args, **kwargs)
+
+        if len(index) > 0:
+            if self.domain.start < index[0]:
+                raise DomainError(u'some domain space is not covered by definition!')
+
+    @classmethod
+    def frombuffer(cls, index, values, dtype=None, domain=None, *args, **kwargs):
+        """
+        Construct from objects exposing the buffer protocol, without copying them
+
+        :param index: buffer of native float64s
+        :param values: buffer of values
+        :param dtype: dtype of values, float64 by default
+        """
+        if np is None:
+            raise ImportError(u'ArrayDiscreteSeries requires numpy')
+
+        return cls(np.frombuffer(index, dtype=np.float64),
+                   np.frombuffer(values, dtype=dtype or np.float64),
+                   domain, *args, **kwargs)
+
+    @classmethod
+    def from_series(cls, series):
+        """
+        Convert a DiscreteSeries
+
+        :param series: a DiscreteSeries
+        :return: a new ArrayDiscreteSeries
+        """
+        if isinstance(series, ArrayDiscreteSeries):
+            return series
+
+        return cls([k for k, v in series.data], [v for k, v in series.data],
+                   series.domain)
+
+    def _view(self, domain):
+        # numpy slices are views, so this does not copy anything
+        lo = max(np.searchsorted(self.index, domain.start, 'right') - 1, 0)
+        hi = np.searchsorted(self.index, domain.stop, 'right')
+        return ArrayDiscreteSeries(self.index[lo:hi], self.values[lo:hi], domain)
+
+    def _get_for(self, item):
+        i = np.searchsorted(self.index, item, 'right') - 1
+        if i < 0:
+            raise RuntimeError(u'should never happen')
+
+        return self.values[i:i + 1].tolist()[0]
+
+    def _get_for_many(self, items):
+        pos = np.searchsorted(self.index, np.asarray(items, dtype=np.float64), 'right') - 1
+        if len(pos) > 0 and pos.min() < 0:
+            raise RuntimeError(u'should never happen')
+
+        return self.values[pos].tolist()
+
+    def apply(self, fun, vectorized=False):
+        """
+        :param vectorized: if True, fun will be called once, with the index and the value
+            arrays, and must return an array of new values
+        """
+        if vectorized:
+            return ArrayDiscreteSeries(self.index, fun(self.index, self.values), self.domain)
+
+        assert _has_arguments(fun, 2), u'fun must have at least 2 arguments'
+
+        return ArrayDiscreteSeries(self.index, [fun(k, v) for k, v in self.data],
+                                   self.domain)
+
+    def translate(self, x):
+        return ArrayDiscreteSeries(self.index + x, self.values, self.domain.translate(x))
+
+    def _integral_index(self):
+        if self._areas is None and self.values.dtype.kind in 'biuf':
+            self._areas = np.concatenate(([0], np.cumsum(self.values[:-1] *
+                                                         np.diff(self.index))))
+        return super(ArrayDiscreteSeries, self)._integral_index()
+
+    def _integral_to(self, t):
+        areas = self._integral_index()
+        i = np.searchsorted(self.index, t, 'right') - 1
+        return (areas[i] + self.values[i] * (t - self.index[i])).item()
+
+    def _sparse_table(self, op):
+        if self.values.dtype.kind not in 'biuf':
+            return super(ArrayDiscreteSeries, self)._sparse_table(op)
+
+        if self._ranges is None:
+            self._ranges = {}
+
+        if op not in self._ranges:
+            values = self.values
+            row, step = np.arange(len(values)), 1
+            table = [row]
+            while 2 * step <= len(values):
+                a, b = row[:-step], row[step:]
+                better = values[b] < values[a] if op == 'min' else values[b] > values[a]
+                row = np.where(better, b, a)
+                table.append(row)
+                step *= 2
+            self._ranges[op] = table
+        return self._ranges[op]
+
+    def resample(self, width, agg='mean', origin=None):
+        if not isinstance(agg, str) or self.values.dtype.kind not in 'biuf':
+            return super(ArrayDiscreteSeries, self).resample(width, agg, origin)
+        if agg not in _AGGREGATES:
+            raise ValueError(u'unknown aggregation %s' % (agg,))
+
+        origin, count, end, domain = self._buckets(width, origin)
+        starts = origin + width * np.arange(count, dtype=np.float64)
+        lo = np.maximum(starts, self.domain.start)
+        hi = np.minimum(starts + width, end)
+
+        index, values = self.index, self.values
+        first = np.searchsorted(index, lo, 'right') - 1  # active at start of bucket
+        last = np.maximum(np.searchsorted(index, hi, 'left') - 1, first)  # active at its end
+
+        if agg == 'mean':
+            sums = np.concatenate(([0], np.cumsum(values, dtype=np.float64)))
+            result = (sums[last + 1] - sums[first]) / (last - first + 1)
+        elif agg == 'twmean':
+            areas = self._integral_index()
+
+            def integral(t):
+                i = np.searchsorted(index, t, 'right') - 1
+                return areas[i] + values[i] * (t - index[i])
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result = (integral(hi) - integral(lo)) / (hi - lo)
+            result = np.where(hi > lo, result, values[last])
+        elif agg in ('min', 'max'):
+            # reduceat over [first, last + 1) of each bucket - every second result
+            bounds = np.empty(2 * count, dtype=np.intp)
+            bounds[0::2] = first
+            bounds[1::2] = last + 1
+            padded = np.concatenate((values, values[-1:]))
+            ufunc = np.minimum if agg == 'min' else np.maximum
+            result = ufunc.reduceat(padded, bounds)[0::2]
+        elif agg == 'last':
+            result = values[last]
+        else:
+            result = np.searchsorted(index, hi, 'left') - np.searchsorted(index, lo, 'left')
+
+        return ArrayDiscreteSeries(starts, result, domain)
+
+    def join_discrete(self, series, fun, vectorized=False):
+        """
+        :param vectorized: if True, fun will be called once, with arrays of indices and of
+            values of both series, and must return an array of new values.
+            Requires series to be a DiscreteSeries.
+        """
+        if isinstance(series, DiscreteSeries) and series._stepwise:
+            if not vectorized:
+                assert _has_arguments(fun, 3), u'fun must have at least 3 arguments!'
+            return self._join_arrays(ArrayDiscreteSeries.from_series(series), fun,
+                                     vectorized)
+        elif vectorized:
+            raise TypeError(u'vectorized joins require a discrete series')
+
+        return super(ArrayDiscreteSeries, self).join_discrete(series, fun)
+
+    def _join_arrays(self, series, fun, vectorized):
+        new_domain = self.domain.intersection(series.domain)
+
+        if new_domain.is_empty():
+            return DiscreteSeries([])
+
+        keys = np.union1d(self.index, series.index)
+        keys = keys[(keys > new_domain.start) & (keys <= new_domain.stop)]
+        keys = np.concatenate(([new_domain.start], keys))
+
+        v1 = self.values[np.searchsorted(self.index, keys, 'right') - 1]
+        v2 = series.values[np.searchsorted(series.index, keys, 'right') - 1]
+
+        if vectorized:
+            values = _asvalues(fun(keys, v1, v2))
+        else:
+            values = _asvalues([fun(k, a, b) for k, a, b in
+                                zip(keys.tolist(), v1.tolist(), v2.tolist())])
+
+        # skip points that do not change the value
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = values[1:] != values[:-1]
+        return ArrayDiscreteSeries(keys[keep], values[keep], new_domain)
+
+
+class ArrayDiscreteSeriesBundle(DiscreteSeriesBundle):
+    """
+    A bundle of discrete series, kept as a single float64 index and a 2-D array of
+    values, with a column for each series. Columns are contiguous.
+
+    If all series share an index, the bundle shares it too, and otherwise they are
+    aligned onto the union of their indices, within the bundle's domain. Either way,
+    values are copied into the array, converted to a common dtype - so int columns
+    become float64 when bundled with float ones. The bundle's series are views of
+    its columns.
+
+    Lookups return rows of the array, which are views and do not copy anything.
+
+    Requires NumPy.
+    """
+
+    def __init__(self, *series):
+        """
+        :raise TypeError: not all series are stepwise discrete series
+        :raise ValueError: no series were given
+        :raise ImportError: NumPy is not installed
+        """
+        if np is None:
+            raise ImportError(u'ArrayDiscreteSeriesBundle requires numpy')
+
+        super(ArrayDiscreteSeriesBundle, self).__init__(*series)
+
+        if len(series) == 0:
+            raise ValueError(u'at least one series is required')
+        if not all(s._stepwise for s in series):
+            raise TypeError(u'All series must be stepwise')
+
+        series = [ArrayDiscreteSeries.from_series(s) for s in series]
+        first = series[0].index
+        if all(s.index is first or np.array_equal(s.index, first) for s in series):
+            index = first
+            columns = [s.values for s in series]
+        elif self.domain.is_empty():
+            index = np.empty(0, dtype=np.float64)
+            columns = [s.values[:0] for s in series]
+        else:
+            # a k-way alignment - each series' value at each point of any of them
+            start, stop = self.domain.start, self.domain.stop
+            index = functools.reduce(np.union1d, (s.index for s in series))
+            index = np.concatenate(([start], index[(index > start) & (index <= stop)]))
+            columns = [s.values[np.searchsorted(s.index, index, 'right') - 1] for s in series]
+
+        self.index = index
+        self.values = np.empty((len(index), len(columns)), order='F',
+                               dtype=np.result_type(*columns))
+        for j, column in enumerate(columns):
+            self.values[:, j] = column
+
+        self.series = tuple(ArrayDiscreteSeries(index, self.values[:, j], self.domain)
+                            for j in range(len(columns)))
+
+    @classmethod
+    def from_columns(cls, index, columns, domain=None):
+        """
+        :param index: sorted indices, shared by all columns
+        :param columns: sequences of values, as many as indices each
+        :param domain: domain of the bundle, by default spanning the index
+        """
+        index = np.asarray(index, dtype=np.float64)
+        return cls(*(ArrayDiscreteSeries(index, column, domain) for column in columns))
+
+    def _get_for(self, item):
+        return self.values[np.searchsorted(self.index, item, 'right') - 1]
+
+    def _get_for_many(self, items):
+        pos = np.searchsorted(self.index, np.asarray(items, dtype=np.float64), 'right') - 1
+        return list(self.values[pos])
+
+    def join_columns(self, fun, vectorized=False):
+        """
+        Join all the series, computing a value from each row
+
+        :param fun: callable(index: float, *values) -> value
+        :param vectorized: if True, fun will be called once, with the index array and
+            the columns, and must return an array of new values
+        :return: an ArrayDiscreteSeries, skipping points that do not change the value
+        """
+        if vectorized:
+            values = _asvalues(fun(self.index, *(self.values[:, j]
+                                                 for j in range(self.values.shape[1]))))
+        else:
+            values = _asvalues([fun(k, *row) for k, row in
+                                zip(self.index.tolist(), self.values.tolist())])
+
+        keep = np.ones(len(values), dtype=bool)
+        keep[1:] = values[1:] != values[:-1]
+        return ArrayDiscreteSeries(self.index[keep], values[keep], self.domain)
@@ -1,9 +1,35 @@
+import asyncio
+import bisect
+import collections.abc
 import inspect
-
+import itertools
+import math
+import numbers
+import operator
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from sortedcontainers import SortedList
 
-from firanka.exceptions import DomainError
-from firanka.intervals import Interval, EMPTY_SET
+from firanka.exceptions import DomainError, NotInDomainError
+from firanka.intervals import Interval, IntervalArray, EMPTY_SET
+from firanka.series import instrumentation
+
+_RAISE = object()  # sentinel - raise instead of using a default
+_AGGREGATES = ('mean', 'twmean', 'min', 'max', 'last', 'count')
+
+
+def _with_defaults(values, in_domain, default, mask):
+    """Put default in place of points not in the domain, see Series._check_points"""
+    if in_domain is None:
+        return (values, [True] * len(values)) if mask else values
+
+    values = iter(values)
+    values = [next(values) if ok else default for ok in in_domain]
+    return (values, in_domain) if mask else values
 
 
 def _has_arguments(fun, n):  # used only in assert clauses
@@ -11,6 +37,19 @@ def _has_arguments(fun, n):  # used only in assert clauses
     return len(inspect.getargspec(fun).args) >= n
 
 
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+
+def _eval_chunk(series, items):  # module-level, so that process pools can pickle it
+    return series._get_for_many(items)
+
+
 class Series:
     """
     Abstract, base class for series.
@@ -25,6 +64,14 @@ class Series:
         self.domain = domain
         self.comment = comment
 
+    stats = None  # an instrumentation.Stats, if instrumented
+
+    def __getstate__(self):  # probes of instrument() stay behind
+        state = self.__dict__.copy()
+        for name in ('_get_for', '_get_for_many', '_aget_for_many', 'stats'):
+            state.pop(name, None)
+        return state
+
     def __getitem__(self, item):
         """
         Return a value for given index, or a subslice of this series
@@ -39,19 +86,160 @@ class Series:
             self.domain.contains_or_fail(item)
             return AlteredSeries(self, domain=self.domain.intersection(item))
         else:
-            self.domain.contains_or_fail(item)
+            if not self.domain._contains_point(item):
+                raise NotInDomainError(item, self.domain)
             return self._get_for(item)
 
+    def unchecked(self, interval=None):
+        """
+        Return a callable(index) -> value, that does not check whether index is in
+        the domain - for evaluating many indices known to be within interval.
+
+        :param interval: interval that indices will be within, checked once, here.
+            By default, the whole domain.
+        :raise NotInDomainError: interval is not within the domain
+        """
+        if interval is not None:
+            self.domain.contains_or_fail(interval)
+        return self._get_for
+
     def _get_for(self, item):
         raise NotImplementedError(u'This is abstract, override me!')
 
-    def eval_points(self, points):
+    def _get_for_many(self, items):
+        """
+        Batched version of _get_for. Override it if you can do better than a loop.
+
+        :param items: a list of indices, all of them in the domain, in any order
+        :return: a list of values, in the order of items
+        """
+        return [self._get_for(item) for item in items]
+
+    async def _aget_for_many(self, items):
+        """
+        Coroutine version of _get_for_many. Series that evaluate asynchronously override
+        it, and so do series computed from other series, to await them.
+        """
+        return self._get_for_many(items)
+
+    def _get_for_many_in(self, items, executor=None, chunksize=None):
+        """
+        _get_for_many, but possibly split into chunks evaluated on an executor
+        """
+        if executor is None or len(items) == 0:
+            return self._get_for_many(items)
+
+        if chunksize is None:
+            chunksize = -(-len(items) // (4 * (os.cpu_count() or 1)))
+
+        chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+        values = []
+        for chunk in executor.map(_eval_chunk, itertools.repeat(self, len(chunks)), chunks):
+            values.extend(chunk)
+        return values
+
+    def eval_points(self, points, default=_RAISE, mask=False, executor=None, chunksize=None):
         """
         Return values for given points. A mass [] one could say
+
+        The whole batch is checked against the domain at once.
+
         :param points: iterable of indices
+        :param default: value to return for points outside of the domain. If not given,
+            NotInDomainError will be raised instead (or None used, if mask is True)
+        :param mask: if True, a tuple of (values, mask) will be returned, where mask is
+            a list of bools telling which points were in the domain
+        :param executor: a concurrent.futures.Executor to evaluate chunks of points on.
+            A ProcessPoolExecutor will need to pickle this series with every chunk.
+        :param chunksize: amount of points in a chunk. By default points are split
+            into 4 chunks per CPU.
         :return: a list of values
+        :raises NotInDomainError: a point was not in domain, and no default was given
         """
-        return [self[p] for p in points]
+        points = list(points)
+        in_domain, default = self._check_points(points, default, mask)
+        if in_domain is not None:
+            points = [p for p, ok in zip(points, in_domain) if ok]
+
+        return _with_defaults(self._get_for_many_in(points, executor, chunksize),
+                              in_domain, default, mask)
+
+    async def eval_points_async(self, points, default=_RAISE, mask=False):
+        """
+        Coroutine version of eval_points, that awaits series which evaluate asynchronously,
+        such as AsyncFunctionSeries
+        """
+        points = list(points)
+        in_domain, default = self._check_points(points, default, mask)
+        if in_domain is not None:
+            points = [p for p, ok in zip(points, in_domain) if ok]
+
+        return _with_defaults(await self._aget_for_many(points), in_domain, default, mask)
+
+    def _check_points(self, points, default, mask):
+        """
+        Check points against the domain, for eval_points
+
+        :return: a tuple of (list of bools telling which points are in the domain, or
+            None if all of them are, default value to use for the others)
+        :raises NotInDomainError: a point was not in domain, and no default was given
+        """
+        # domain is convex, so checking the extremes suffices
+        if len(points) == 0 or (self.domain._contains_point(min(points)) and
+                                self.domain._contains_point(max(points))):
+            return None, default
+
+        if np is not None and all(isinstance(p, float) for p in points):
+            in_domain = IntervalArray.from_intervals([self.domain]).contains(points).tolist()
+        else:  # ints could lose precision as floats
+            in_domain = [self.domain._contains_point(p) for p in points]
+
+        if default is _RAISE:
+            if not mask:
+                raise NotInDomainError(points[in_domain.index(False)], self.domain)
+            default = None
+
+        return in_domain, default
+
+    def iter_points(self, points, chunksize=1024):
+        """
+        Lazy version of eval_points. Points are consumed, and values yielded, in chunks,
+        so memory usage does not depend on the amount of points.
+
+        :param points: iterable of indices
+        :param chunksize: amount of points evaluated at once
+        :return: an iterator of values
+        :raises NotInDomainError: upon reaching a chunk with a point not in domain
+        """
+        for chunk in _chunks(points, chunksize):
+            yield from self.eval_points(chunk)
+
+    def stream_discretize(self, points, chunksize=1024):
+        """
+        Lazy version of discretize. Points are consumed in chunks, and only those
+        where the value changes are yielded.
+
+        Given to a DiscreteSeries, along with the domain from the first to the last
+        point, the result has the same values as what discretize() would return - but
+        not its points that repeat the previous value. Without that domain, the
+        DiscreteSeries would end at the last point where the value changed.
+
+        :param points: iterable of sorted indices
+        :param chunksize: amount of points evaluated at once
+        :return: an iterator of (index, value)
+        :raises ValueError: points were not sorted
+        :raises NotInDomainError: upon reaching a chunk with a point not in domain
+        """
+        previous = None
+        for chunk in _chunks(points, chunksize):
+            if (previous is not None and chunk[0] < previous[0]) or \
+                    any(a > b for a, b in zip(chunk, chunk[1:])):
+                raise ValueError(u'points must be sorted')
+
+            for point, value in zip(chunk, self.eval_points(chunk)):
+                if previous is None or previous[1] != value:
+                    yield point, value
+                previous = point, value
 
     def apply(self, fun):
         """
@@ -63,21 +251,45 @@ class Series:
 
         return AlteredSeries(self, fun=fun)
 
-    def discretize(self, points, domain=None):
+    def discretize(self, points, domain=None, executor=None, chunksize=None):
         """
         Return this as a DiscreteSeries, sampled at points
+
+        :param executor: a concurrent.futures.Executor to evaluate chunks of sorted points
+            on, see eval_points
+        :param chunksize: amount of points in a chunk
         :return: a DiscreteSeries instance
         """
+        points, domain = self._discretize_points(points, domain)
         if len(points) == 0:
             return DiscreteSeries([])
 
-        points = list(sorted(points))
+        return DiscreteSeries(list(zip(points, self.eval_points(points, executor=executor,
+                                                                chunksize=chunksize))),
+                              domain)
 
-        domain = domain or Interval(points[0], points[-1], True, True)
+    async def discretize_async(self, points, domain=None):
+        """Coroutine version of discretize, see eval_points_async"""
+        points, domain = self._discretize_points(points, domain)
+        if len(points) == 0:
+            return DiscreteSeries([])
 
-        self.domain.contains_or_fail(domain)
+        return DiscreteSeries(list(zip(points, await self.eval_points_async(points))), domain)
 
-        return DiscreteSeries([(i, self[i]) for i in points], domain)
+    def _discretize_points(self, points, domain):
+        """
+        Sort points and check the domain, for discretize
+
+        :return: a tuple of (sorted points, domain of the result)
+        :raises NotInDomainError: domain is not within this series' domain
+        """
+        points = sorted(points)
+        if len(points) == 0:
+            return points, domain
+
+        domain = domain or Interval(points[0], points[-1], True, True)
+        self.domain.contains_or_fail(domain)
+        return points, domain
 
     def join(self, series, fun):
         """
@@ -93,18 +305,92 @@ class Series:
 
     def translate(self, x):
         """
-        Translate the series by some distance
+        Translate the series by some distance, so that its value at t is this series'
+        value at t - x, just as DiscreteSeries.translate moves its points by x
         :param x: a float
         :return: new Series instance
         """
         return AlteredSeries(self, x=x)
 
+    def _children(self):
+        """Return series that this one is computed from"""
+        return []
+
+    def _describe(self):
+        return '%s %s' % (type(self).__name__, self.domain)
+
+    def _walk(self):
+        yield self
+        for child in self._children():
+            yield from child._walk()
+
+    def instrument(self, enabled=True):
+        """
+        Start recording how many times each series in this one's tree is evaluated,
+        and for how long, see explain(). Stats of each series start from zero, and are
+        available as its stats.
+
+        Only evaluations in this process are recorded. Instrument series after you
+        optimize() them, as optimizing builds new series.
+
+        :param enabled: False to stop recording
+        :return: self
+        """
+        for series in self._walk():
+            if enabled:
+                instrumentation.instrument(series)
+            else:
+                instrumentation.uninstrument(series)
+        return self
+
+    def explain(self, file=None):
+        """
+        Print the tree of this series, along with stats of each series if instrumented
+
+        :param file: a file to print to, sys.stdout by default
+        """
+        def lines(series, depth):
+            line = '  ' * depth + series._describe()
+            if series.stats is not None:
+                line += ': %s' % (series.stats,)
+            yield line
+            for child in series._children():
+                yield from lines(child, depth + 1)
+
+        print('\n'.join(lines(self, 0)), file=file)
+
+    def optimize(self):
+        """
+        Return an equivalent series that is cheaper to evaluate.
+
+        Consecutive applies, translations and slices get fused into one, slices are
+        pushed down towards the leaves, and applies, translations and slices of
+        discrete series get computed into new discrete series.
+
+        :return: a Series instance, possibly self
+        """
+        return self
+
+    def _narrow(self, domain):
+        """
+        Return this series restricted to domain, if it can do better than wrapping
+        itself in an AlteredSeries.
+
+        :param domain: an Interval, a subset of this series' domain
+        :return: a Series instance, or None
+        """
+        return None
+
 
 class DiscreteSeries(Series):
     """
     A series with lots of small rectangles interpolating something
     """
 
+    _stepwise = True  # are values constant between the data points?
+    _areas = None  # integral from the first point to each point, built on first use
+    _ranges = None  # 'min'/'max' => sparse table, built on first use
+
     def __init__(self, data, domain=None, *args, **kwargs):
 
         data = SortedList(data)
@@ -115,70 +401,464 @@ class DiscreteSeries(Series):
             domain = Interval(data[0][0], data[-1][0], True, True)
 
         self.data = data
+        self._keys = [k for k, v in data]  # sorted, for binary searches
         super(DiscreteSeries, self).__init__(domain, *args, **kwargs)
 
         if len(data) > 0:
             if self.domain.start < data[0][0]:
                 raise DomainError(u'some domain space is not covered by definition!')
 
+    def _describe(self):
+        return '%s %s, %d points' % (type(self).__name__, self.domain, len(self.data))
+
+    @classmethod
+    def _from_sorted(cls, data, keys, domain, *args, **kwargs):
+        """
+        Construct directly from already sorted data and its keys, without copying them.
+        Nothing is checked.
+        """
+        series = cls.__new__(cls)
+        series.data = data
+        series._keys = keys
+        Series.__init__(series, domain, *args, **kwargs)
+        return series
+
     def apply(self, fun):
         assert _has_arguments(fun, 2), u'fun must have at least 2 arguments'
 
         return DiscreteSeries([(k, fun(k, v)) for k, v in self.data],
                               self.domain)
 
-    def _get_for(self, item):
-        if item == self.data[0]:
-            return self.data[0][1]
+    def __getitem__(self, item):
+        if not isinstance(item, (Interval, slice)) or not self._stepwise:
+            return super(DiscreteSeries, self).__getitem__(item)
+
+        if isinstance(item, slice):
+            item = Interval(item)
 
-        for k, v in reversed(self.data):
-            if k <= item:
-                return v
+        self.domain.contains_or_fail(item)
+        return self._view(self.domain.intersection(item))
 
-        raise RuntimeError(u'should never happen')
+    def _view(self, domain):
+        """
+        Return a DiscreteSeries over domain, sharing this series' storage.
+        This takes two binary searches.
+        """
+        lo = max(_bisect_right(self._keys, domain.start) - 1, 0)
+        hi = _bisect_right(self._keys, domain.stop)
+        view = DiscreteSeries._from_sorted(_Window(self.data, lo, hi),
+                                           _Window(self._keys, lo, hi), domain)
+        if self._areas is not None:  # integrals are differences, so they still work
+            view._areas = _Window(self._areas, lo, hi)
+        return view
+
+    def _get_for(self, item):
+        i = _bisect_right(self._keys, item) - 1
+        if i < 0:
+            raise RuntimeError(u'should never happen')
+
+        return self.data[i][1]
+
+    def _get_for_many(self, items):
+        # a merge scan over sorted items, bisecting the keys from the previous position
+        keys, data = self._keys, self.data
+        values = [None] * len(items)
+        i = 0
+        for pos in sorted(range(len(items)), key=items.__getitem__):
+            i = _bisect_right(keys, items[pos], i)
+            if i == 0:
+                raise RuntimeError(u'should never happen')
+            values[pos] = data[i - 1][1]
+        return values
 
     def translate(self, x):
         return DiscreteSeries([(k + x, v) for k, v in self.data],
                               self.domain.translate(x))
 
+    def _narrow(self, domain):
+        if not self._stepwise:
+            return None
+
+        return self._view(domain)
+
+    def _integral_index(self):
+        """
+        Return a sequence of integrals from the first point up to each point.
+        It's built on first use, in O(n).
+        """
+        if self._areas is None:
+            if not self._stepwise:
+                raise TypeError(u'only stepwise series can be integrated')
+
+            areas = []
+            total, prev_k, prev_v = 0, None, None
+            for k, v in self.data:
+                if prev_k is not None:
+                    total += prev_v * (k - prev_k)
+                areas.append(total)
+                prev_k, prev_v = k, v
+            self._areas = areas
+        return self._areas
+
+    def _integral_to(self, t):
+        """Integral from the first point up to t"""
+        areas = self._integral_index()
+        i = _bisect_right(self._keys, t) - 1
+        k, v = self.data[i]
+        return areas[i] + v * (t - k)
+
+    def integrate(self, interval):
+        """
+        Return the integral of this series over an interval.
+
+        This takes two binary searches, after an index is built on first use in O(n).
+        Values must support addition and multiplication by floats.
+
+        :param interval: an Interval or its string representation
+        :raise NotInDomainError: interval is not in the domain
+        :raise TypeError: this series is not stepwise
+        """
+        if not isinstance(interval, Interval):
+            interval = Interval(interval)
+        self.domain.contains_or_fail(interval)
+
+        if interval.is_empty():
+            return 0
+
+        return self._integral_to(interval.stop) - self._integral_to(interval.start)
+
+    def mean(self, interval):
+        """
+        Return the mean value of this series over an interval, weighted by how long
+        values last. See integrate().
+
+        For an interval of zero length, the value at it's start is returned.
+        """
+        if not isinstance(interval, Interval):
+            interval = Interval(interval)
+
+        if interval.length() == 0:
+            return self[interval.start]
+
+        return self.integrate(interval) / interval.length()
+
+    def _sparse_table(self, op):
+        """
+        Return a sparse table for op ('min' or 'max'). Its row j holds, for each
+        position i, the position of the op value among 2**j points starting at i -
+        the first one, on ties. It's built on first use, in O(n log n) time and memory.
+        """
+        if self._ranges is None:
+            self._ranges = {}
+
+        if op not in self._ranges:
+            if not self._stepwise:
+                raise TypeError(u'only stepwise series support range queries')
+
+            values = [v for k, v in self.data]
+            better = operator.lt if op == 'min' else operator.gt
+            row, step = list(range(len(values))), 1
+            table = [row]
+            while 2 * step <= len(values):
+                row = [b if better(values[b], values[a]) else a
+                       for a, b in zip(row, row[step:])]
+                table.append(row)
+                step *= 2
+            self._ranges[op] = table
+        return self._ranges[op]
+
+    def _range_query(self, interval, op):
+        """Return (index, value) of the first op value within interval"""
+        if not isinstance(interval, Interval):
+            interval = Interval(interval)
+        self.domain.contains_or_fail(interval)
+        if interval.is_empty():
+            raise ValueError(u'interval is empty')
+
+        table = self._sparse_table(op)
+        lo = _bisect_right(self._keys, interval.start) - 1
+        if interval.right_inc:
+            hi = _bisect_right(self._keys, interval.stop) - 1
+        else:
+            hi = max(_bisect_left(self._keys, interval.stop) - 1, lo)
+
+        j = (hi - lo + 1).bit_length() - 1
+        (ka, va), (kb, vb) = self.data[table[j][lo]], self.data[table[j][hi - (1 << j) + 1]]
+        better = operator.lt if op == 'min' else operator.gt
+        k, v = (kb, vb) if better(vb, va) else (ka, va)
+        return max(k, interval.start), v
+
+    def min(self, interval):
+        """
+        Return the minimum value of this series over an interval.
+
+        This takes two binary searches, after an index is built on first use in
+        O(n log n) time and memory. Values must be comparable.
+
+        :param interval: an Interval or its string representation
+        :raise NotInDomainError: interval is not in the domain
+        :raise ValueError: interval is empty
+        :raise TypeError: this series is not stepwise
+        """
+        return self._range_query(interval, 'min')[1]
+
+    def max(self, interval):
+        """Return the maximum value of this series over an interval. See min()."""
+        return self._range_query(interval, 'max')[1]
+
+    def argmin(self, interval):
+        """
+        Return the first index within an interval where the minimum is attained,
+        or the interval's start if it's attained right after it. See min().
+        """
+        return self._range_query(interval, 'min')[0]
+
+    def argmax(self, interval):
+        """Return the first index where the maximum is attained. See argmin()."""
+        return self._range_query(interval, 'max')[0]
+
+    def _buckets(self, width, origin):
+        """
+        Lay out buckets for resample()
+
+        :return: a tuple of (origin, amount of buckets, end of data, domain of result)
+        """
+        if not self._stepwise:
+            raise TypeError(u'only stepwise series can be resampled')
+        if width <= 0:
+            raise ValueError(u'bucket width must be positive')
+
+        start, stop = self.domain.start, self.domain.stop
+        origin = start if origin is None else origin
+        if math.isinf(origin) or self.domain.is_empty():
+            raise DomainError(u'cannot resample a series without a finite start')
+        if origin > stop or (origin == stop and not self.domain.right_inc):
+            raise ValueError(u'origin %s is past the end of the domain %s'
+                             % (origin, self.domain))
+
+        domain = self.domain
+        if origin > start:
+            domain = domain.intersection(Interval(origin, math.inf, True, False))
+        else:  # skip buckets before the domain
+            origin += ((start - origin) // width) * width
+
+        if math.isinf(stop):  # up to the bucket with the last point
+            count = max(1, int((self._keys[-1] - origin) // width) + 1)
+            return origin, count, origin + count * width, domain
+
+        return origin, max(1, int(math.ceil((stop - origin) / width))), stop, domain
+
+    def resample(self, width, agg='mean', origin=None):
+        """
+        Aggregate this series into buckets of given width
+
+        Buckets are left-closed, right-open, and clipped to the domain. They cover the
+        whole domain, or if it's infinite, the domain up to the last data point.
+
+        :param width: width of a bucket
+        :param agg: how to aggregate values within a bucket, one of:
+            * 'mean' - mean of values in the bucket
+            * 'twmean' - mean of values in the bucket, weighted by how long they last
+            * 'min' and 'max'
+            * 'last' - value at the end of the bucket
+            * 'count' - amount of data points within the bucket
+            * a callable(values: list) -> value
+        :param origin: where the first bucket starts, by default the domain's start.
+            Buckets are aligned to it.
+        :return: a new DiscreteSeries, with a point at the start of each bucket
+        :raise TypeError: this series is not stepwise
+        :raise ValueError: invalid width or agg, or origin past the end of the domain
+        :raise DomainError: domain start is infinite
+        """
+        if agg not in _AGGREGATES and not callable(agg):
+            raise ValueError(u'unknown aggregation %s' % (agg,))
+
+        origin, count, end, domain = self._buckets(width, origin)
+        first = max(origin, self.domain.start)
+
+        points = _iter_from(self.data, _bisect_right(self._keys, first) - 1)
+        cur_k, cur_v = next(points)
+        nxt = next(points, None)
+
+        result = []
+        for b in range(count):
+            lo = max(origin + b * width, first)
+            hi = min(origin + (b + 1) * width, end)
+
+            while nxt is not None and nxt[0] <= lo:
+                cur_k, cur_v = nxt
+                nxt = next(points, None)
+
+            values = [cur_v]
+            points_in = 1 if cur_k == lo else 0
+            integral, t = 0, lo
+            while nxt is not None and nxt[0] < hi:
+                integral += cur_v * (nxt[0] - t)
+                t = nxt[0]
+                cur_k, cur_v = nxt
+                nxt = next(points, None)
+                values.append(cur_v)
+                points_in += 1
+
+            if agg == 'mean':
+                value = sum(values) / len(values)
+            elif agg == 'twmean':
+                value = (integral + cur_v * (hi - t)) / (hi - lo) if hi > lo else cur_v
+            elif agg == 'min':
+                value = min(values)
+            elif agg == 'max':
+                value = max(values)
+            elif agg == 'last':
+                value = cur_v
+            elif agg == 'count':
+                value = points_in
+            else:
+                value = agg(values)
+
+            result.append((origin + b * width, value))
+
+        return DiscreteSeries(result, domain)
+
+    def rolling(self, window, agg='twmean'):
+        """
+        Aggregate this series over a window of given width, trailing every moment
+
+        The window for t is <t - window; t>, clipped to the domain. It is computed in a
+        single sweep over data points, so it takes linear time whatever the window.
+
+        :param window: width of the window
+        :param agg: how to aggregate values within the window, one of:
+            * 'twmean' - mean of the series over the window, weighted by time
+            * 'min' and 'max' - of values the series takes within the window
+            * 'sum' and 'count' - of data points with keys in (t - window; t>
+        :return: a new DiscreteSeries over the same domain, with a point wherever the
+            aggregate changes. Only 'twmean' changes in between its points as well,
+            linearly - it is exact at the points.
+        :raise TypeError: this series is not stepwise
+        :raise ValueError: invalid window or agg
+        :raise DomainError: domain start is infinite
+        """
+        if not self._stepwise:
+            raise TypeError(u'only stepwise series can be rolled')
+        if window <= 0:
+            raise ValueError(u'window must be positive')
+        if agg not in ('twmean', 'min', 'max', 'sum', 'count'):
+            raise ValueError(u'unknown aggregation %s' % (agg,))
+
+        domain = self.domain
+        start, stop = domain.start, domain.stop
+        if domain.is_empty() or math.isinf(start):
+            raise DomainError(u'cannot roll a series without a finite start')
+
+        # data points within the domain, the first one moved to its start
+        points = _iter_from(self.data, _bisect_right(self._keys, start) - 1)
+        first_k, first_v = next(points)
+        keys, values = [start], [first_v]
+        for k, v in points:
+            if k > stop or (k == stop and not domain.right_inc):
+                break
+            keys.append(k)
+            values.append(v)
+        n = len(keys)
+        ends = [k + window for k in keys]  # when each point leaves the window
+        counted = 0 if first_k == start else 1  # first point counted by sum and count
+
+        result = []
+        i = e = 0  # points keys[:i] have entered the window, ends[:e] have left it
+        total = 0  # sum of values[max(e, counted):i]
+        areas = [0]  # integral from start to keys[x], for every x < i
+        extremes = collections.deque()  # indices of points, values monotonic in order
+        while True:
+            t = min(keys[i] if i < n else math.inf, ends[e] if e < n else math.inf)
+            if t > stop or (t == stop and not domain.right_inc):
+                break
+
+            while i < n and keys[i] <= t:
+                if agg == 'twmean' and i > 0:
+                    areas.append(areas[-1] + values[i - 1] * (keys[i] - keys[i - 1]))
+                elif agg == 'sum' and i >= counted:
+                    total += values[i]
+                elif agg == 'min':
+                    while extremes and values[extremes[-1]] >= values[i]:
+                        extremes.pop()
+                    extremes.append(i)
+                elif agg == 'max':
+                    while extremes and values[extremes[-1]] <= values[i]:
+                        extremes.pop()
+                    extremes.append(i)
+                i += 1
+
+            while e < n and ends[e] <= t:
+                if agg == 'sum' and e >= counted:
+                    total -= values[e]
+                e += 1
+
+            j = max(e - 1, 0)  # point in effect at the start of the window
+            if agg == 'twmean':
+                to_t = areas[i - 1] + values[i - 1] * (t - keys[i - 1])
+                to_lo = areas[j] + values[j] * (t - window - keys[j]) if e > 0 else 0
+                width = min(window, t - start)
+                value = (to_t - to_lo) / width if width > 0 else values[i - 1]
+            elif agg == 'sum':
+                value = total
+            elif agg == 'count':
+                value = i - max(e, counted)
+            else:
+                while extremes[0] < j:
+                    extremes.popleft()
+                value = values[extremes[0]]
+
+            if len(result) == 0 or result[-1][1] != value:
+                result.append((t, value))
+
+        return DiscreteSeries(result, domain)
+
     def _join_discrete_other_discrete(self, series, fun):
         new_domain = self.domain.intersection(series.domain)
 
         assert isinstance(series, DiscreteSeries)
 
-        a = self.data[::-1]
-        b = series.data[::-1]
+        if new_domain.is_empty():
+            return DiscreteSeries([])
 
-        ptr = self.domain.start
-        c = [(ptr, fun(ptr, self._get_for(ptr), series._get_for(ptr)))]
+        # a single merge pass, carrying the current value of each side forward
+        ptr, stop = new_domain.start, new_domain.stop
+        i = _bisect_right(self._keys, ptr)
+        j = _bisect_right(series._keys, ptr)
+        v1 = self.data[i - 1][1] if self._stepwise else self._get_for(ptr)
+        v2 = series.data[j - 1][1] if series._stepwise else series._get_for(ptr)
 
-        while len(a) > 0 and len(b) > 0:
-            if a[-1] < b[-1]:
-                ptr, v1 = a.pop()
-                v2 = series._get_for(ptr)
-            elif a[-1] > b[-1]:
-                ptr, v1 = b.pop()
-                v2 = self._get_for(ptr)
-            else:
-                ptr, v1 = a.pop()
-                _, v2 = b.pop()
+        c = [(ptr, fun(ptr, v1, v2))]
 
-            _appendif(c, ptr, fun(ptr, v1, v2))
+        a = _iter_from(self.data, i)
+        b = _iter_from(series.data, j)
+        pa = next(a, None)
+        pb = next(b, None)
 
-        if len(a) > 0 or len(b) > 0:
-            if len(a) > 0:
-                assert len(b) == 0
-                rest = a
-                static_v = series._get_for(ptr)
-                op = lambda ptr, me, const: fun(ptr, me, const)
+        while pa is not None or pb is not None:
+            if pb is None or (pa is not None and pa[0] <= pb[0]):
+                ptr = pa[0]
             else:
-                assert len(a) == 0
-                rest = b
-                static_v = self._get_for(ptr)
-                op = lambda ptr, me, const: fun(ptr, const, me)
+                ptr = pb[0]
+
+            if ptr > stop:
+                break
+
+            if pa is not None and pa[0] == ptr:
+                while pa is not None and pa[0] == ptr:
+                    v1 = pa[1]
+                    pa = next(a, None)
+            elif not self._stepwise:
+                v1 = self._get_for(ptr)
+
+            if pb is not None and pb[0] == ptr:
+                while pb is not None and pb[0] == ptr:
+                    v2 = pb[1]
+                    pb = next(b, None)
+            elif not series._stepwise:
+                v2 = series._get_for(ptr)
 
-            for ptr, v in rest:
-                _appendif(c, ptr, op(ptr, v, static_v))
+            _appendif(c, ptr, fun(ptr, v1, v2))
 
         return DiscreteSeries(c, new_domain)
 
@@ -186,7 +866,7 @@ class DiscreteSeries(Series):
         if isinstance(series, DiscreteSeries):
             return self.join_discrete(series, fun)  # same effect
         else:
-            super(DiscreteSeries, self).join(series, fun)
+            return super(DiscreteSeries, self).join(series, fun)
 
     def join_discrete(self, series, fun):
         """
@@ -219,15 +899,54 @@ class DiscreteSeries(Series):
         return DiscreteSeries(c, new_domain)
 
 
+def _identity(k, v):
+    return v
+
+
+class _Fused(object):
+    """
+    Two functions applied one after another, as in AlteredSeries over an AlteredSeries
+    """
+    __slots__ = ('inner', 'outer', 'x')
+
+    def __init__(self, inner, outer, x):
+        """
+        :param inner: function applied first, receiving indices translated by -x
+        :param outer: function applied later
+        :param x: translation between inner and outer
+        """
+        self.inner = inner
+        self.outer = outer
+        self.x = x
+
+    def __call__(self, k, v):
+        return self.outer(k, self.inner(k - self.x, v))
+
+
+def _fuse(inner, outer, x):
+    if inner is _identity:
+        return outer
+    if outer is _identity and x == 0:
+        return inner
+    return _Fused(inner, outer, x)
+
+
+def _narrowed(series, domain):
+    """Return series narrowed to domain (a subset of it's domain), or None if impossible"""
+    if domain == series.domain:
+        return series
+    return series._narrow(domain)
+
+
 class AlteredSeries(Series):
     """
     Internal use - for applyings, translations and slicing
     """
 
-    def __init__(self, series, domain=None, fun=lambda k, v: v, x=0, *args, **kwargs):
+    def __init__(self, series, domain=None, fun=_identity, x=0, *args, **kwargs):
         """
         :param series: original series
-        :param domain: new domain to use [if sliced]
+        :param domain: new domain to use [if sliced], in terms of the original series
         :param fun: (index, v) -> newV [if applied]
         :param x: translation vector [if translated]
         """
@@ -238,7 +957,215 @@ class AlteredSeries(Series):
         self.x = x
 
     def _get_for(self, item):
-        return self.fun(item, self.series._get_for(item + self.x))
+        return self.fun(item, self.series._get_for(item - self.x))
+
+    def _get_for_many(self, items):
+        values = self.series._get_for_many([item - self.x for item in items])
+        if self.fun is _identity:
+            return values
+        return [self.fun(item, v) for item, v in zip(items, values)]
+
+    async def _aget_for_many(self, items):
+        values = await self.series._aget_for_many([item - self.x for item in items])
+        if self.fun is _identity:
+            return values
+        return [self.fun(item, v) for item, v in zip(items, values)]
+
+    def _children(self):
+        return [self.series]
+
+    def optimize(self):
+        series = self.series.optimize()
+        fun, x = self.fun, self.x
+
+        while isinstance(series, AlteredSeries):
+            fun = _fuse(series.fun, fun, x)
+            x += series.x
+            series = series.series
+
+        domain = self.domain.translate(-x)
+        narrowed = _narrowed(series, domain)
+        if narrowed is None:
+            return AlteredSeries(series, domain, fun, x)
+        series = narrowed
+
+        if isinstance(series, DiscreteSeries) and series._stepwise:
+            if x != 0:
+                series = series.translate(x)
+            if fun is not _identity:
+                series = series.apply(fun)
+            return series
+
+        if x == 0 and fun is _identity:
+            return series
+
+        return AlteredSeries(series, fun=fun, x=x)
+
+    def _narrow(self, domain):
+        return AlteredSeries(self.series, domain.translate(-self.x), self.fun, self.x)
+
+
+class _Window(collections.abc.Sequence):
+    """
+    A read-only view of seq[start:stop], that does not copy seq
+    """
+    __slots__ = ('seq', 'start', 'stop')
+
+    def __init__(self, seq, start=0, stop=None):
+        if isinstance(seq, _Window):
+            start, stop = seq.start + start, seq.start + (len(seq) if stop is None else stop)
+            seq = seq.seq
+
+        self.seq = seq
+        self.start = start
+        self.stop = len(seq) if stop is None else stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step == 1:
+                return _Window(self, start, max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('index out of range')
+        return self.seq[self.start + item]
+
+    def islice(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        if hasattr(self.seq, 'islice'):
+            return self.seq.islice(self.start + start, self.start + stop)
+        return (self.seq[i] for i in range(self.start + start, self.start + stop))
+
+    def __iter__(self):
+        return self.islice()
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence) or len(self) != len(other):
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return '_Window(%s)' % (list(self),)
+
+    def __reduce__(self):  # pickle just the window, not the whole sequence
+        return _Window, (list(self),)
+
+
+class _Pairs(collections.abc.Sequence):
+    """
+    A read-only view of two parallel sequences, of keys and values, as a sequence
+    of (key, value)
+    """
+    __slots__ = ('keys', 'values')
+
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return _Window(self)[item]
+        return self.keys[item], self.values[item]
+
+    def __iter__(self):
+        return zip(self.keys, self.values)
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence) or len(self) != len(other):
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return '_Pairs(%s)' % (list(self),)
+
+    def __reduce__(self):
+        return _Pairs, (list(self.keys), list(self.values))
+
+
+def _typecode_for(values):
+    """
+    Pick a typecode of the array module to store values with, for storage and
+    CompressedDiscreteSeries
+
+    :return: 'q' if all values are ints, else 'd'
+    :raise TypeError: a value is not an int or a float (bools are neither), or ints do
+        not fit in 64 bits
+    """
+    ints = True
+    for v in values:
+        if isinstance(v, (bool, np.bool_) if np is not None else bool) or \
+                not isinstance(v, numbers.Real):
+            raise TypeError(u'only ints and floats can be stored, not %r' % (v,))
+        ints = ints and isinstance(v, numbers.Integral)
+
+    if not ints:
+        return 'd'
+    if not all(-2 ** 63 <= v < 2 ** 63 for v in values):
+        raise TypeError(u'ints to be stored must fit in 64 bits')
+    return 'q'
+
+
+class _Searchable(collections.abc.Sequence):
+    """
+    A sorted sequence of keys, that can be binary-searched faster than through
+    __getitem__
+    """
+
+    def bisect_left(self, x, lo, hi):
+        raise NotImplementedError(u'This is abstract, override me!')
+
+    def bisect_right(self, x, lo, hi):
+        raise NotImplementedError(u'This is abstract, override me!')
+
+
+def _bisect_right(keys, x, lo=0):
+    """
+    bisect.bisect_right, searching windows over the underlying sequence directly,
+    and letting _Searchable sequences search themselves
+    """
+    if type(keys) is list:
+        return bisect.bisect_right(keys, x, lo)
+
+    offset, hi = 0, len(keys)
+    if isinstance(keys, _Window):
+        offset, hi, keys = keys.start, keys.stop, keys.seq
+    if isinstance(keys, _Searchable):
+        return keys.bisect_right(x, offset + lo, hi) - offset
+    return bisect.bisect_right(keys, x, offset + lo, hi) - offset
+
+
+def _bisect_left(keys, x, lo=0):
+    """bisect.bisect_left, see _bisect_right"""
+    if type(keys) is list:
+        return bisect.bisect_left(keys, x, lo)
+
+    offset, hi = 0, len(keys)
+    if isinstance(keys, _Window):
+        offset, hi, keys = keys.start, keys.stop, keys.seq
+    if isinstance(keys, _Searchable):
+        return keys.bisect_left(x, offset + lo, hi) - offset
+    return bisect.bisect_left(keys, x, offset + lo, hi) - offset
+
+
+def _iter_from(data, start):
+    """
+    Iterate over a sequence of data points, starting from position start.
+    Sequences that can do it faster than by skipping items have an islice(start) method.
+    """
+    if hasattr(data, 'islice'):
+        return data.islice(start)
+    if isinstance(data, _Pairs):
+        return zip(data.keys[start:], data.values[start:])
+    return itertools.islice(data, start, None)
 
 
 def _appendif(lst, ptr, v):
@@ -267,3 +1194,34 @@ class JoinedSeries(Series):
 
     def _get_for(self, item):
         return self.op(item, self.ser1._get_for(item), self.ser2._get_for(item))
+
+    def _get_for_many(self, items):
+        return [self.op(item, v1, v2) for item, v1, v2 in
+                zip(items, self.ser1._get_for_many(items), self.ser2._get_for_many(items))]
+
+    async def _aget_for_many(self, items):
+        values1, values2 = await asyncio.gather(self.ser1._aget_for_many(items),
+                                                self.ser2._aget_for_many(items))
+        return [self.op(item, v1, v2) for item, v1, v2 in zip(items, values1, values2)]
+
+    def _children(self):
+        return [self.ser1, self.ser2]
+
+    def optimize(self):
+        ser1, ser2 = self.ser1.optimize(), self.ser2.optimize()
+        ser1 = _narrowed(ser1, self.domain) or ser1
+        ser2 = _narrowed(ser2, self.domain) or ser2
+
+        if isinstance(ser1, DiscreteSeries) and isinstance(ser2, DiscreteSeries) and \
+                ser1._stepwise and ser2._stepwise:
+            return ser1.join_discrete(ser2, self.op)
+
+        return JoinedSeries(ser1, ser2, self.op)
+
+    def _narrow(self, domain):
+        ser1 = _narrowed(self.ser1, domain)
+        ser2 = _narrowed(self.ser2, domain)
+        if ser1 is None and ser2 is None:
+            return None
+
+        return JoinedSeries(ser1 or self.ser1, ser2 or self.ser2, self.op)
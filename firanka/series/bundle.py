@@ -1,14 +1,21 @@
+import asyncio
 import functools
+import heapq
+import itertools
 import logging
-
-from sortedcontainers import SortedSet, SortedList
+import operator
 
 logger = logging.getLogger(__name__)
 
-from .base import Series, DiscreteSeries
+from .base import Series, DiscreteSeries, _narrowed
 from ..intervals import REAL_SET
 
 
+def _tagged(n, data):
+    for k, v in data:
+        yield k, n, v
+
+
 class SeriesBundle(Series):
     """
     Bundles a bunch of series together, returning a list from their outputs
@@ -26,6 +33,31 @@ class SeriesBundle(Series):
     def _get_for(self, item):
         return [s._get_for(item) for s in self.series]
 
+    def _get_for_many(self, items):
+        if len(self.series) == 0:
+            return [[] for _ in items]
+        return [list(row) for row in zip(*(s._get_for_many(items) for s in self.series))]
+
+    async def _aget_for_many(self, items):
+        if len(self.series) == 0:
+            return [[] for _ in items]
+        columns = await asyncio.gather(*(s._aget_for_many(items) for s in self.series))
+        return [list(row) for row in zip(*columns)]
+
+    def _children(self):
+        return list(self.series)
+
+    def optimize(self):
+        series = [s.optimize() for s in self.series]
+        return type(self)(*(_narrowed(s, self.domain) or s for s in series))
+
+    def _narrow(self, domain):
+        series = [_narrowed(s, domain) for s in self.series]
+        if all(s is None for s in series):
+            return None
+
+        return type(self)(*(n or s for n, s in zip(series, self.series)))
+
 
 class DiscreteSeriesBundle(SeriesBundle):
     def __init__(self, *series):
@@ -37,26 +69,50 @@ class DiscreteSeriesBundle(SeriesBundle):
         if any((not isinstance(s, DiscreteSeries)) for s in series):
             raise TypeError('All series must be discrete')
 
-    def compose(self):
+    def compose(self, columnar=False):
         """
         Return a DiscreteSet from multiple bunded series.
-        This does not lose accuracy.
+        This does not lose accuracy. Points that would not change the value are skipped.
 
         If you use any fancy classes based from DiscreteSeries,
         their functionality WILL BE LOST.
-        """
-        keys = SortedSet()
 
-        for s in self.series:
-            for k, v in s.data:
-                keys.add(k)
-
-        data = SortedList()
-        for k in keys:
-            v = self._get_for(k)
-            if len(data) > 0 and data[-1][1] == v:
-                continue
-            else:
-                data.add((k, v))
-
-        return DiscreteSeries([(k, self._get_for(k)) for k in keys], self.domain)
+        :param columnar: if True, a tuple of (indices, columns) will be returned instead,
+            where columns is a list of lists of values, one for each bundled series
+        """
+        start, stop = self.domain.start, self.domain.stop
+        current = [None] * len(self.series)
+        keys = []
+        columns = [[] for _ in self.series]
+
+        def emit(k):
+            keys.append(k)
+            for col, v in zip(columns, current):
+                col.append(v)
+
+        # a k-way merge of all the series, advancing a cursor in each
+        merged = heapq.merge(*(_tagged(n, s.data) for n, s in enumerate(self.series)))
+
+        changed = True
+        for k, points in itertools.groupby(merged, key=operator.itemgetter(0)):
+            if k > stop:
+                break
+            if k > start and len(keys) == 0:
+                emit(start)
+                changed = False
+            for _, n, v in points:
+                if current[n] != v:
+                    current[n] = v
+                    changed = True
+            if k >= start and changed:
+                emit(k)
+                changed = False
+
+        if len(keys) == 0 and not self.domain.is_empty():
+            emit(start)
+
+        if columnar:
+            return keys, columns
+
+        return DiscreteSeries(list(zip(keys, (list(row) for row in zip(*columns)))),
+                              self.domain)
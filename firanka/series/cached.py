@@ -0,0 +1,160 @@
+import collections
+import math
+import threading
+import time
+
+from .base import Series
+
+__all__ = [
+    'CachedSeries',
+]
+
+
+class CachedSeries(Series):
+    """
+    A series remembering values of another series for most recently used indices.
+
+    Use it to wrap series that are expensive to evaluate, such as FunctionSeries
+    calling a model. It is safe to use from multiple threads.
+    """
+
+    def __init__(self, series, maxsize=1024, quantum=None, ttl=None, *args, **kwargs):
+        """
+        :param series: series to cache
+        :param maxsize: maximum amount of values to remember. Least recently used
+            ones are forgotten first.
+        :param quantum: if given, indices are rounded down to a multiple of quantum to
+            obtain cache keys, so all indices within the same quantum share a value -
+            the one computed for the first of them that was looked up
+        :param ttl: if given, values are forgotten after this many seconds
+        """
+        super(CachedSeries, self).__init__(series.domain, *args, **kwargs)
+        self.series = series
+        self.maxsize = maxsize
+        self.quantum = quantum
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self._cache = collections.OrderedDict()  # key => (value, expires at or None)
+        self._lock = threading.Lock()
+
+    def _key(self, item):
+        if self.quantum is None:
+            return item
+        return math.floor(item / self.quantum)
+
+    def _lookup(self, key, now):
+        """Must be called with the lock held. Return a tuple of (value, ), or None"""
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._cache[key]
+            self.misses += 1
+            return None
+
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return value,
+
+    def _store(self, pairs, now):
+        expires_at = None if self.ttl is None else now + self.ttl
+        with self._lock:
+            for key, value in pairs:
+                self._cache[key] = value, expires_at
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def _get_for(self, item):
+        key = self._key(item)
+        now = time.monotonic()
+
+        with self._lock:
+            found = self._lookup(key, now)
+        if found is not None:
+            return found[0]
+
+        # computed without the lock, so that slow lookups do not block each other
+        value = self.series._get_for(item)
+        self._store([(key, value)], now)
+        return value
+
+    def _get_for_many(self, items):
+        missing, values, now = self._lookup_many(items)
+        computed = self.series._get_for_many([items[positions[0]]
+                                              for positions in missing.values()])
+        return self._fill_many(missing, values, computed, now)
+
+    async def _aget_for_many(self, items):
+        missing, values, now = self._lookup_many(items)
+        computed = await self.series._aget_for_many([items[positions[0]]
+                                                     for positions in missing.values()])
+        return self._fill_many(missing, values, computed, now)
+
+    def _lookup_many(self, items):
+        """
+        Look items up in the cache
+
+        :return: a tuple of (OrderedDict of keys missing from the cache => their
+            positions in items, list of values found - None for missing ones, now)
+        """
+        keys = [self._key(item) for item in items]
+        now = time.monotonic()
+        values = [None] * len(items)
+        missing = collections.OrderedDict()  # key => positions in items
+
+        with self._lock:
+            for pos, key in enumerate(keys):
+                if key in missing:
+                    missing[key].append(pos)
+                    self.hits += 1
+                    continue
+
+                found = self._lookup(key, now)
+                if found is None:
+                    missing[key] = [pos]
+                else:
+                    values[pos] = found[0]
+
+        return missing, values, now
+
+    def _fill_many(self, missing, values, computed, now):
+        """Put values computed for missing keys in place, and remember them"""
+        for positions, value in zip(missing.values(), computed):
+            for pos in positions:
+                values[pos] = value
+
+        self._store(zip(missing.keys(), computed), now)
+        return values
+
+    def _children(self):
+        return [self.series]
+
+    def _describe(self):
+        looked_up = self.hits + self.misses
+        return '%s, hits=%d misses=%d (%.0f%% hit rate)' % (
+            super(CachedSeries, self)._describe(), self.hits, self.misses,
+            100.0 * self.hits / looked_up if looked_up else 0)
+
+    def __getstate__(self):  # the cache and the lock stay behind
+        state = super(CachedSeries, self).__getstate__()
+        state['hits'] = state['misses'] = 0
+        state['_cache'] = collections.OrderedDict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Forget all cached values, and reset hit and miss counters"""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,296 @@
+import array
+import bisect
+import collections.abc
+import itertools
+import operator
+import threading
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .base import DiscreteSeries, Series, _Searchable, _typecode_for
+from ..exceptions import DomainError
+from ..intervals import Interval, EMPTY_SET
+
+__all__ = [
+    'CompressedDiscreteSeries',
+]
+
+_MASK = 2 ** 64 - 1
+
+
+def _bits(seq, typecode):
+    """Reinterpret seq, stored as typecode, as unsigned 64-bit ints"""
+    bits = array.array('Q')
+    bits.frombytes(array.array(typecode, seq).tobytes())
+    return bits
+
+
+def _unbits(bits, typecode):
+    seq = array.array(typecode)
+    seq.frombytes(bits.tobytes())
+    return seq.tolist()
+
+
+def _encode(keys, values, typecode):
+    """
+    Compress a block. Keys are stored as delta-of-deltas of their bits, values as
+    XORs of consecutive values' bits if they are floats, else as deltas - all of them
+    modulo 2**64, so nothing is lost. The result is deflated.
+    """
+    encoded = array.array('Q')
+
+    prev, prev_delta = 0, 0
+    for bits in _bits(keys, 'd'):
+        delta = (bits - prev) & _MASK
+        encoded.append((delta - prev_delta) & _MASK)
+        prev, prev_delta = bits, delta
+
+    prev = 0
+    for bits in _bits(values, typecode):
+        encoded.append(bits ^ prev if typecode == 'd' else (bits - prev) & _MASK)
+        prev = bits
+
+    return zlib.compress(encoded.tobytes())
+
+
+def _decode(block, count, typecode):
+    """:return: a tuple of (keys, values) of a block compressed by _encode"""
+    raw = zlib.decompress(block)
+
+    if np is not None:  # uint64 arithmetic wraps around by itself
+        encoded = np.frombuffer(raw, dtype=np.uint64)
+        keys = np.cumsum(np.cumsum(encoded[:count]))
+        if typecode == 'd':
+            values = np.bitwise_xor.accumulate(encoded[count:])
+        else:
+            values = np.cumsum(encoded[count:])
+        return keys.view(np.float64).tolist(), values.view(typecode).tolist()
+
+    encoded = array.array('Q')
+    encoded.frombytes(raw)
+    keys = array.array('Q', [k & _MASK for k in itertools.accumulate(
+        itertools.accumulate(encoded[:count]))])
+    if typecode == 'd':
+        values = array.array('Q', itertools.accumulate(encoded[count:], operator.xor))
+    else:
+        values = array.array('Q', [v & _MASK for v in itertools.accumulate(encoded[count:])])
+    return _unbits(keys, 'd'), _unbits(values, typecode)
+
+
+class _Blocks(object):
+    """
+    Compressed blocks of data points, with a small cache of decoded ones
+    """
+
+    def __init__(self, data, block_size, cache_blocks):
+        data = list(data)
+        keys = [k for k, v in data]
+        values = [v for k, v in data]
+        self.typecode = _typecode_for(values)
+
+        self.length = len(data)
+        self.first_keys = keys[::block_size]  # for finding the block a key is in
+        self.starts = list(range(0, len(data), block_size))  # position of each block
+        self.blocks = [_encode(keys[i:i + block_size], values[i:i + block_size],
+                               self.typecode)
+                       for i in self.starts]
+        self.block_size = block_size
+        self.cache_blocks = cache_blocks
+
+        self._cache = collections.OrderedDict()  # block number => (keys, values)
+        self._lock = threading.Lock()
+
+    def decode(self, b, cache=True):
+        """
+        :param cache: whether to remember the decoded block. Streams do not, so that
+            they do not evict blocks used by lookups.
+        :return: a tuple of (keys, values) of block b
+        """
+        with self._lock:
+            decoded = self._cache.get(b)
+            if decoded is not None:
+                self._cache.move_to_end(b)
+                return decoded
+
+        count = min(self.block_size, self.length - self.starts[b])
+        decoded = _decode(self.blocks[b], count, self.typecode)
+
+        if cache:
+            with self._lock:
+                self._cache[b] = decoded
+                while len(self._cache) > self.cache_blocks:
+                    self._cache.popitem(last=False)
+        return decoded
+
+    def locate(self, pos):
+        """:return: a tuple of (block number, position within it)"""
+        if pos < 0:
+            pos += self.length
+        if not 0 <= pos < self.length:
+            raise IndexError('index out of range')
+        return pos // self.block_size, pos % self.block_size
+
+    def islice(self, start=0, stop=None):
+        """Iterate over (key, value) from position start to stop, decoding block by block"""
+        stop = self.length if stop is None else min(stop, self.length)
+        for b in range(start // self.block_size, -(-stop // self.block_size)):
+            keys, values = self.decode(b, cache=False)
+            lo = max(start - self.starts[b], 0)
+            hi = min(stop - self.starts[b], len(keys))
+            yield from zip(keys[lo:hi], values[lo:hi])
+
+    def nbytes(self):
+        return sum(len(block) for block in self.blocks) + 16 * len(self.blocks)
+
+    def __getstate__(self):  # the cache and the lock stay behind
+        state = self.__dict__.copy()
+        state['_cache'] = collections.OrderedDict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class _CompressedData(collections.abc.Sequence):
+    """Read-only view of compressed blocks as a sequence of (key, value)"""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def __len__(self):
+        return self.blocks.length
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step == 1:
+                return list(self.islice(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+
+        b, i = self.blocks.locate(item)
+        keys, values = self.blocks.decode(b)
+        return keys[i], values[i]
+
+    def __iter__(self):
+        return self.blocks.islice()
+
+    def islice(self, start=0, stop=None):
+        return self.blocks.islice(start, stop)
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.abc.Sequence) or len(self) != len(other):
+            return False
+        return all(a == tuple(b) for a, b in zip(self, other))
+
+    def __repr__(self):
+        return '_CompressedData(%s)' % (list(self),)
+
+
+class _CompressedKeys(_Searchable):
+    """Read-only view of keys of compressed blocks, that searches the block index first"""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def __len__(self):
+        return self.blocks.length
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [k for k, v in _CompressedData(self.blocks)[item]]
+
+        b, i = self.blocks.locate(item)
+        return self.blocks.decode(b)[0][i]
+
+    def islice(self, start=0, stop=None):
+        return (k for k, v in self.blocks.islice(start, stop))
+
+    def bisect_left(self, x, lo, hi):
+        if self.blocks.length == 0:
+            return lo
+        b = max(bisect.bisect_left(self.blocks.first_keys, x) - 1, 0)
+        pos = self.blocks.starts[b] + bisect.bisect_left(self.blocks.decode(b)[0], x)
+        return min(max(pos, lo), hi)
+
+    def bisect_right(self, x, lo, hi):
+        if self.blocks.length == 0:
+            return lo
+        b = max(bisect.bisect_right(self.blocks.first_keys, x) - 1, 0)
+        pos = self.blocks.starts[b] + bisect.bisect_right(self.blocks.decode(b)[0], x)
+        return min(max(pos, lo), hi)
+
+
+class CompressedDiscreteSeries(DiscreteSeries):
+    """
+    A DiscreteSeries keeping its data compressed, in blocks of block_size points.
+
+    A lookup decompresses only the block it lands in, and the most recently used
+    blocks are kept decompressed. Joins, discretizations and iteration over data
+    decompress blocks one by one, as they go.
+
+    Keys are stored as delta-of-deltas, so regularly spaced ones take little space,
+    and so do values that change rarely. Values must be ints or floats.
+    """
+
+    def __init__(self, data, domain=None, block_size=1024, cache_blocks=4,
+                 *args, **kwargs):
+        """
+        :param data: sorted data points, or a DiscreteSeries
+        :param block_size: amount of points in a block
+        :param cache_blocks: amount of decompressed blocks to keep
+        :raise TypeError: values are not ints or floats, or ints do not fit in 64 bits
+        """
+        if isinstance(data, DiscreteSeries):
+            data, domain = data.data, domain or data.domain
+
+        blocks = _Blocks(data, block_size, cache_blocks)
+
+        if blocks.length == 0:
+            domain = EMPTY_SET
+        elif domain is None:
+            last = blocks.decode(len(blocks.blocks) - 1, cache=False)[0][-1]
+            domain = Interval(blocks.first_keys[0], last, True, True)
+
+        self._blocks = blocks
+        self.data = _CompressedData(blocks)
+        self._keys = _CompressedKeys(blocks)
+        Series.__init__(self, domain, *args, **kwargs)
+
+        if blocks.length > 0:
+            if self.domain.start < blocks.first_keys[0]:
+                raise DomainError(u'some domain space is not covered by definition!')
+
+    def _get_for(self, item):
+        blocks = self._blocks
+        b = bisect.bisect_right(blocks.first_keys, item) - 1
+        if b < 0:
+            raise RuntimeError(u'should never happen')
+
+        keys, values = blocks.decode(b)
+        return values[bisect.bisect_right(keys, item) - 1]
+
+    def _get_for_many(self, items):
+        # in order of items, so that each block is decompressed at most once
+        blocks = self._blocks
+        values = [None] * len(items)
+        b, keys, block_values = -1, None, None
+        for pos in sorted(range(len(items)), key=items.__getitem__):
+            item = items[pos]
+            nb = bisect.bisect_right(blocks.first_keys, item, max(b, 0)) - 1
+            if nb < 0:
+                raise RuntimeError(u'should never happen')
+            if nb != b:
+                b = nb
+                keys, block_values = blocks.decode(b)
+            values[pos] = block_values[bisect.bisect_right(keys, item) - 1]
+        return values
+
+    def nbytes(self):
+        """:return: approximate amount of memory taken by compressed data, in bytes"""
+        return self._blocks.nbytes()
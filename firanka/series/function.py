@@ -1,3 +1,5 @@
+import asyncio
+
 from .base import Series
 
 
@@ -12,3 +14,64 @@ class FunctionSeries(Series):
 
     def _get_for(self, item):
         return self.fun(item)
+
+    def _get_for_many(self, items):
+        return list(map(self.fun, items))
+
+    def _narrow(self, domain):
+        return FunctionSeries(self.fun, domain, comment=self.comment)
+
+
+class AsyncFunctionSeries(Series):
+    """
+    Series with values defined by a coroutine function, such as one fetching them
+    from a service.
+
+    Evaluate it with eval_points_async() or discretize_async(), which call the
+    function concurrently. Plain lookups, eval_points() and discretize() work too,
+    but each of them runs a new event loop of its own. So they are costly one point
+    at a time, and raise RuntimeError if called from within a running loop.
+    """
+
+    def __init__(self, fun, domain, concurrency=16, batch_size=None, *args, **kwargs):
+        """
+        :param fun: async callable(index: float) -> value, or if batch_size is given,
+            async callable(indices: list) -> list of values
+        :param concurrency: maximum amount of calls to fun awaited at once, within
+            one evaluation
+        :param batch_size: if given, fun is called with lists of up to this many indices
+        """
+        super(AsyncFunctionSeries, self).__init__(domain, *args, **kwargs)
+        self.fun = fun
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+
+    def _get_for(self, item):
+        # runs an event loop for this single lookup - use eval_points() for many of them
+        return self._get_for_many([item])[0]
+
+    def _get_for_many(self, items):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:  # none is running, so one can be started
+            return asyncio.run(self._aget_for_many(items))
+        raise RuntimeError(u'cannot evaluate an AsyncFunctionSeries synchronously from '
+                           u'within a running event loop, use eval_points_async()')
+
+    async def _aget_for_many(self, items):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def call(arg):
+            async with semaphore:
+                return await self.fun(arg)
+
+        if self.batch_size is None:
+            return list(await asyncio.gather(*(call(item) for item in items)))
+
+        batches = await asyncio.gather(*(call(items[i:i + self.batch_size])
+                                         for i in range(0, len(items), self.batch_size)))
+        return [value for batch in batches for value in batch]
+
+    def _narrow(self, domain):
+        return AsyncFunctionSeries(self.fun, domain, self.concurrency, self.batch_size,
+                                   comment=self.comment)
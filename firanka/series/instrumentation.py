@@ -0,0 +1,110 @@
+"""
+Opt-in instrumentation of series trees, see Series.instrument() and Series.explain().
+
+Instrumenting a series replaces _get_for, _get_for_many and _aget_for_many of every
+node in its tree with probes, set on the instances. Series that are not instrumented are not slowed
+down at all.
+"""
+import contextvars
+import time
+
+__all__ = [
+    'Stats',
+]
+
+# (stats, [time spent in children]) of the innermost active probe. A context variable,
+# so that coroutines evaluated concurrently do not mix up their parents.
+_current = contextvars.ContextVar('firanka_probe', default=None)
+
+
+class Stats(object):
+    """
+    What a node of an instrumented tree did.
+
+    Counts are not synchronized, so they are approximate if a series is evaluated
+    from many threads at once. Children evaluated concurrently by async evaluation
+    all count towards child_time, which can then exceed time.
+    """
+    __slots__ = ('calls', 'points', 'time', 'child_time')
+
+    def __init__(self):
+        self.calls = 0  # calls to _get_for, _get_for_many and _aget_for_many
+        self.points = 0  # points evaluated by them
+        self.time = 0.0  # seconds spent in them, children included
+        self.child_time = 0.0  # seconds of that spent in instrumented children
+
+    @property
+    def self_time(self):
+        return self.time - self.child_time
+
+    def __repr__(self):
+        return 'calls=%d points=%d total=%.3fms self=%.3fms' % (
+            self.calls, self.points, self.time * 1e3, self.self_time * 1e3)
+
+
+class _Probe(object):
+    """Stands in for a node's _get_for or _get_for_many, recording its stats"""
+    __slots__ = ('fun', 'stats', 'many')
+
+    def __init__(self, fun, stats, many):
+        self.fun = fun
+        self.stats = stats
+        self.many = many
+
+    def _enter(self):
+        """:return: a tuple of (parent, token), or None if already recording this node"""
+        parent = _current.get()
+        if parent is not None and parent[0] is self.stats:
+            return None  # eg. default _aget_for_many calling _get_for_many
+        return parent, _current.set((self.stats, [0.0]))
+
+    def _exit(self, entered, arg, took):
+        parent, token = entered
+        stats = self.stats
+        stats.calls += 1
+        stats.points += len(arg) if self.many else 1
+        stats.time += took
+        stats.child_time += _current.get()[1][0]
+        _current.reset(token)
+        if parent is not None:
+            parent[1][0] += took
+
+    def __call__(self, arg):
+        entered = self._enter()
+        if entered is None:
+            return self.fun(arg)
+
+        started = time.perf_counter()
+        try:
+            return self.fun(arg)
+        finally:
+            self._exit(entered, arg, time.perf_counter() - started)
+
+
+class _AsyncProbe(_Probe):
+    """Stands in for a node's _aget_for_many"""
+    __slots__ = ()
+
+    async def __call__(self, arg):
+        entered = self._enter()
+        if entered is None:
+            return await self.fun(arg)
+
+        started = time.perf_counter()
+        try:
+            return await self.fun(arg)
+        finally:
+            self._exit(entered, arg, time.perf_counter() - started)
+
+
+def instrument(series):
+    series.stats = stats = Stats()
+    cls = type(series)
+    series._get_for = _Probe(cls._get_for.__get__(series), stats, False)
+    series._get_for_many = _Probe(cls._get_for_many.__get__(series), stats, True)
+    series._aget_for_many = _AsyncProbe(cls._aget_for_many.__get__(series), stats, True)
+
+
+def uninstrument(series):
+    for name in ('_get_for', '_get_for_many', '_aget_for_many'):
+        series.__dict__.pop(name, None)
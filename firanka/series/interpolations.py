@@ -1,3 +1,5 @@
+import bisect
+
 from .base import DiscreteSeries, Series
 
 
@@ -9,6 +11,8 @@ def SCALAR_LINEAR_INTERPOLATOR(t0, v0, t1, v1, tt):
 
 
 class LinearInterpolationSeries(DiscreteSeries):
+    _stepwise = False  # values are interpolated between the data points
+
     def __init__(self, data, domain=None,
                  interpolator=SCALAR_LINEAR_INTERPOLATOR,
                  *args, **kwargs):
@@ -34,11 +38,33 @@ class LinearInterpolationSeries(DiscreteSeries):
         if len(self.data) == 1:
             return super(LinearInterpolationSeries, self).__getitem__(item)
 
-        for i in range(0, len(self.data) - 1):
-            cur_i, cur_v = self.data[i]
-            next_i, next_v = self.data[i + 1]
+        i = bisect.bisect_left(self._keys, item)
+        if i == 0:
+            return self.data[0][1]
 
-            if cur_i <= item <= next_i:
-                return self.interpolator(cur_i, cur_v, next_i, next_v, item)
+        if i < len(self.data):
+            cur_i, cur_v = self.data[i - 1]
+            next_i, next_v = self.data[i]
+            return self.interpolator(cur_i, cur_v, next_i, next_v, item)
 
         return self.data[-1][1]
+
+    def _get_for_many(self, items):
+        if len(self.data) == 1:
+            return [self._get_for(item) for item in items]
+
+        keys, data = self._keys, self.data
+        values = [None] * len(items)
+        i = 0
+        for pos in sorted(range(len(items)), key=items.__getitem__):
+            item = items[pos]
+            i = bisect.bisect_left(keys, item, i)
+            if i == 0 or item == self.domain.start:
+                values[pos] = data[0][1]
+            elif i < len(data):
+                cur_i, cur_v = data[i - 1]
+                next_i, next_v = data[i]
+                values[pos] = self.interpolator(cur_i, cur_v, next_i, next_v, item)
+            else:
+                values[pos] = data[-1][1]
+        return values
@@ -1,7 +1,40 @@
+import itertools
 import math
 
-from .base import Series
-from ..intervals import REAL_SET
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .array import ArrayDiscreteSeries
+from .base import DiscreteSeries, Series, _bisect_left, _bisect_right, _iter_from
+from ..intervals import Interval, REAL_SET
+
+
+def _all_floats(items):
+    """Are all items floats, so that they can be worked on as float64 exactly?"""
+    if isinstance(items, np.ndarray):
+        return items.dtype == np.float64
+    return all(isinstance(item, float) for item in items)
+
+
+def _as_int64(items):
+    """:return: items as an int64 array with room for adding to them, or None"""
+    if isinstance(items, np.ndarray):
+        ok = items.dtype.kind == 'i'
+    else:
+        ok = all(isinstance(item, int) and not isinstance(item, bool) for item in items)
+    if not ok or not -2 ** 62 <= min(items) or not max(items) <= 2 ** 62:
+        return None
+    return np.asarray(items, dtype=np.int64)
+
+
+def _as_float64(array):
+    """:return: array as float64 if that is exact, else array unchanged"""
+    if array.dtype.kind in 'iu' and (len(array) == 0 or
+                                     -2 ** 53 <= array.min() and array.max() <= 2 ** 53):
+        return array.astype(np.float64)
+    return array
 
 
 class ModuloSeries(Series):
@@ -24,7 +57,11 @@ class ModuloSeries(Series):
         # We internally translate the start of the series' domain to be at 0, because it simpler for us :D
         self.intertrans = -self.series.domain.start
 
-    def _get_for(self, item):
+        self._index = None  # keys of a discrete base series as an array, built on first use
+        self._values = None
+
+    def _phase(self, item):
+        """Map item onto the base series' domain"""
         item += self.intertrans
 
         if item < 0:
@@ -34,4 +71,118 @@ class ModuloSeries(Series):
         elif item == self.period:
             item = 0
 
-        return self.series._get_for(self.series.domain.start + item)
+        return self.series.domain.start + item
+
+    def _get_for(self, item):
+        return self.series._get_for(self._phase(item))
+
+    def _phases(self, items):
+        """
+        _phase of all items at once. The arithmetic is the same, in int64 if the items
+        and the period are ints, else in float64.
+
+        :return: an array, or a list if numpy could not compute phases exactly
+        """
+        start, period, trans = self.series.domain.start, self.period, self.intertrans
+        if not _all_floats(items):
+            array = _as_int64(items)
+            if array is None:  # mixed, or too large - one by one
+                return [self._phase(item) for item in items]
+            if not all(isinstance(x, int) for x in (start, period, trans)):
+                array = _as_float64(array)
+                if array.dtype != np.float64:
+                    return [self._phase(item) for item in items]
+        else:
+            array = np.asarray(items, dtype=np.float64)
+
+        array = array + trans
+        return start + (array - np.floor_divide(array, period) * period)
+
+    def _get_for_many(self, items):
+        series = self.series
+        if np is None or len(items) == 0:
+            return series._get_for_many([self._phase(item) for item in items])
+
+        phases = self._phases(items)
+        if isinstance(series, ArrayDiscreteSeries):
+            return series._get_for_many(phases)
+        if not isinstance(series, DiscreteSeries) or not series._stepwise:
+            return series._get_for_many(phases if isinstance(phases, list) else phases.tolist())
+
+        if self._index is None:
+            self._index = _as_float64(np.asarray(series._keys))
+            self._values = [v for k, v in series.data]
+
+        # searching with numpy only if it compares phases to keys exactly
+        array = phases if not isinstance(phases, list) else np.asarray(phases)
+        if isinstance(phases, list) and array.dtype.kind == 'f' and not _all_floats(phases):
+            array = None  # ints mixed with floats
+        elif array.dtype != self._index.dtype:
+            array = _as_float64(array)
+        if array is None or array.dtype != self._index.dtype or array.dtype == object:
+            return series._get_for_many(phases if isinstance(phases, list) else phases.tolist())
+
+        values = self._values
+        return [values[i] for i in (np.searchsorted(self._index, array, 'right') - 1).tolist()]
+
+    async def _aget_for_many(self, items):
+        if isinstance(self.series, DiscreteSeries):
+            return self._get_for_many(items)
+        return await self.series._aget_for_many([self._phase(item) for item in items])
+
+    def discretize(self, points=None, domain=None, executor=None, chunksize=None):
+        """
+        Return this as a DiscreteSeries.
+
+        If points are not given, or an Interval is given instead, and the base series
+        is a DiscreteSeries, its points are repeated over the domain instead of
+        evaluating this series anywhere. There will be no points that do not change
+        the value.
+
+        :param points: points to sample at, or an Interval to repeat points over
+        :param domain: domain of the result. Required if neither points nor an
+            Interval are given.
+        :raise ValueError: domain to repeat points over is infinite, or points are not
+            given and the base series is not a DiscreteSeries
+        """
+        if isinstance(points, Interval):
+            points, domain = None, points
+
+        if points is not None:
+            return super(ModuloSeries, self).discretize(points, domain, executor, chunksize)
+        if not isinstance(self.series, DiscreteSeries) or not self.series._stepwise:
+            raise ValueError(u'points must be given, unless the base series is a '
+                             u'stepwise DiscreteSeries')
+
+        if not isinstance(domain, Interval):
+            domain = Interval(domain)
+        if math.isinf(domain.length()):
+            raise ValueError(u'cannot repeat points over an infinite domain')
+        if domain.is_empty():
+            return DiscreteSeries([])
+
+        # points where the value changes, within a single period
+        series, start = self.series, self.series.domain.start
+        lo = _bisect_right(series._keys, start)
+        hi = _bisect_left(series._keys, start + self.period)
+        changes = [(start, series._get_for(start))]
+        changes.extend(itertools.islice(_iter_from(series.data, lo), hi - lo))
+
+        data = [(domain.start, self._get_for(domain.start))]
+        n = math.floor((domain.start - start) / self.period)
+        while True:
+            offset = n * self.period
+            for k, v in changes:
+                k += offset
+                if k > domain.stop or (k == domain.stop and not domain.right_inc):
+                    return DiscreteSeries._from_sorted(data, [k for k, v in data], domain)
+                if k > domain.start and v != data[-1][1]:
+                    data.append((k, v))
+            n += 1
+
+    def _children(self):
+        return [self.series]
+
+    def optimize(self):
+        series = self.series.optimize()
+        return self if series is self.series else ModuloSeries(series)
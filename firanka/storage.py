@@ -0,0 +1,118 @@
+"""
+A binary file format for DiscreteSeries, that can be memory-mapped.
+
+The file is:
+
+* a 32-byte header, little-endian:
+    * magic b'FRNK'
+    * version, unsigned byte
+    * flags, unsigned byte - 1 if domain is left-closed, 2 if it's right-closed,
+      4 if columns are big-endian
+    * typecode of values, as in the array module
+    * a pad byte
+    * domain start and stop, as doubles
+    * amount of points, unsigned 64-bit
+* keys, as doubles
+* values, of their typecode
+"""
+
+import array
+import io
+import mmap
+import struct
+import sys
+
+from .intervals import Interval
+from .series import DiscreteSeries, ArrayDiscreteSeries
+from .series.base import _Pairs, _Window, _typecode_for
+
+__all__ = [
+    'save',
+    'open',
+]
+
+MAGIC = b'FRNK'
+VERSION = 1
+HEADER = struct.Struct('<4sBBcx ddQ')
+TYPECODES = 'bBhHiIlLqQfd'
+
+_LEFT_INC, _RIGHT_INC, _BIG_ENDIAN = 1, 2, 4
+
+
+def save(series, path, typecode=None):
+    """
+    Write a DiscreteSeries to a file
+
+    :param series: a DiscreteSeries
+    :param path: path to the file
+    :param typecode: typecode of values, as in the array module. By default 'q' is used
+        if all values are ints, else 'd'.
+    :raise TypeError: values cannot be stored with this typecode, or if it's not given,
+        are not ints or floats
+    :raise ValueError: invalid typecode
+    """
+    if not isinstance(series, DiscreteSeries):
+        raise TypeError(u'only discrete series can be saved')
+
+    values = [v for k, v in series.data]
+    typecode = typecode or _typecode_for(values)
+    if typecode not in TYPECODES:
+        raise ValueError(u'typecode must be one of %s' % (TYPECODES,))
+
+    keys = array.array('d', (k for k, v in series.data))
+    try:
+        values = array.array(typecode, values)
+    except OverflowError as e:
+        raise TypeError(u'values do not fit in typecode %s: %s' % (typecode, e))
+
+    domain = series.domain
+    flags = (_LEFT_INC if domain.left_inc else 0) | (_RIGHT_INC if domain.right_inc else 0) \
+        | (_BIG_ENDIAN if sys.byteorder == 'big' else 0)
+
+    with io.open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, typecode.encode('ascii'),
+                            domain.start, domain.stop, len(keys)))
+        keys.tofile(f)
+        values.tofile(f)
+
+
+def open(path, as_array=False):
+    """
+    Memory-map a file written by save(). The file's contents are not read into memory,
+    all lookups are served straight from the mapping.
+
+    :param path: path to the file
+    :param as_array: return an ArrayDiscreteSeries, which needs numpy
+    :return: a DiscreteSeries
+    :raise ValueError: not a valid file, or it was written on a machine of different
+        endianness
+    """
+    with io.open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapping) < HEADER.size:
+        raise ValueError(u'file too short')
+
+    magic, version, flags, typecode, start, stop, count = HEADER.unpack_from(mapping)
+    typecode = typecode.decode('ascii')
+    if magic != MAGIC or version != VERSION or typecode not in TYPECODES:
+        raise ValueError(u'not a firanka series file')
+    if bool(flags & _BIG_ENDIAN) != (sys.byteorder == 'big'):
+        raise ValueError(u'file was written on a machine of different endianness')
+
+    itemsize = array.array(typecode).itemsize
+    keys_end = HEADER.size + 8 * count
+    values_end = keys_end + itemsize * count
+    if len(mapping) < values_end:
+        raise ValueError(u'file too short')
+
+    view = memoryview(mapping)
+    keys = view[HEADER.size:keys_end].cast('d')
+    values = view[keys_end:values_end].cast(typecode)
+    domain = Interval(start, stop, bool(flags & _LEFT_INC), bool(flags & _RIGHT_INC))
+
+    if as_array:
+        return ArrayDiscreteSeries.frombuffer(keys, values, typecode, domain)
+
+    keys = _Window(keys)  # a memoryview cannot be pickled, this can
+    return DiscreteSeries._from_sorted(_Pairs(keys, values), keys, domain)
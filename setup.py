@@ -7,6 +7,9 @@ setup(
     version=__version__,
     packages=find_packages(exclude=['tests.*', 'tests', 'docs']),
     install_requires=['sortedcontainers'],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     url='https://github.com/smok-serwis/firanka',
     author=u'Piotr Maślanka',
     author_email=u'pmaslanka@smok.co',
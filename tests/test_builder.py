@@ -1,6 +1,7 @@
+import gc
 import unittest
 
-from firanka.builders import DiscreteSeriesBuilder
+from firanka.builders import DiscreteSeriesBuilder, MaintainedJoin
 from firanka.series import DiscreteSeries
 
 
@@ -31,3 +32,123 @@ class TestBuilder(unittest.TestCase):
         self.assertEqual(s[0], 0)
         self.assertEqual(s[1], 1)
         self.assertEqual(s.domain, '<0;1>')
+
+    def test_snapshots(self):
+        kb = DiscreteSeriesBuilder()
+
+        kb.put(0, 0)
+        kb.put(1, 1)
+        s1 = kb.as_series()
+
+        kb.put(2, 2)
+        s2 = kb.as_series()
+
+        kb.put(0.5, 5)
+        kb.put(1, 6)
+        s3 = kb.as_series()
+
+        kb.put(3, 3)
+        kb.put(0, 7)
+        s4 = kb.as_series()
+
+        self.assertEqual(s1.data, [(0, 0), (1, 1)])
+        self.assertEqual(s1.domain, '<0;1>')
+        self.assertEqual(s2.data, [(0, 0), (1, 1), (2, 2)])
+        self.assertEqual(s3.data, [(0, 0), (0.5, 5), (1, 6), (2, 2)])
+        self.assertEqual(s4.data, [(0, 7), (0.5, 5), (1, 6), (2, 2), (3, 3)])
+        self.assertEqual(s4[1.5], 6)
+        self.assertEqual(s4.eval_points([0.7, 3]), [5, 3])
+
+    def test_integral_index(self):
+        kb = DiscreteSeriesBuilder(DiscreteSeries([(0, 1), (1, 2)]), integral_index=True)
+
+        s1 = kb.as_series()
+        self.assertEqual(s1.integrate('<0;1>'), 1)
+
+        kb.put(3, 4)
+        s2 = kb.as_series()
+        self.assertEqual(s2.integrate('<0;3>'), 5)
+        self.assertEqual(list(s2._areas), [0, 1, 5])
+
+        kb.put(2, 0)
+        kb.put(4, 1)
+        s3 = kb.as_series()
+        self.assertEqual(list(s3._areas), [0, 1, 3, 3, 7])
+        self.assertEqual(s3.mean('<0;4>'), 7 / 4)
+        self.assertEqual(s2.integrate('<0;3>'), 5)
+
+    def test_maintained_join(self):
+        def fun(t, a, b):
+            return a + b
+
+        ka = DiscreteSeriesBuilder(DiscreteSeries([(0, 1), (2, 2)]))
+        kb = DiscreteSeriesBuilder()
+        joined = MaintainedJoin(ka, kb, fun)
+
+        self.assertEqual(joined.as_series().data, [])
+
+        kb.put(1, 10)
+        kb.put(4, 20)
+        s1 = joined.as_series()
+        self.assertEqual(s1.domain, '<1;2>')
+        self.assertEqual(s1.data, [(1, 11), (2, 12)])
+
+        ka.put(5, 3)
+        s2 = joined.as_series()
+        self.assertEqual(s2.domain, '<1;4>')
+        self.assertEqual(s2.data, [(1, 11), (2, 12), (4, 22)])
+
+        kb.put(1.5, 11)  # out of order
+        ka.put(3, 2)  # same value as before, changes nothing
+        s3 = joined.as_series()
+        self.assertEqual(s3.data, ka.as_series().join_discrete(kb.as_series(), fun).data)
+        self.assertEqual(s3.data, [(1, 11), (1.5, 12), (2, 13), (4, 22)])
+
+        self.assertEqual(s1.data, [(1, 11), (2, 12)])
+        self.assertEqual(s2.data, [(1, 11), (2, 12), (4, 22)])
+
+    def test_maintained_join_static(self):
+        static = DiscreteSeries([(0, 0), (3, 1)], '<0;6)')
+        kb = DiscreteSeriesBuilder()
+        joined = MaintainedJoin(static, kb, lambda t, a, b: a * b)
+
+        for i in range(1, 6):
+            kb.put(i, i)
+        self.assertEqual(joined.as_series().data, [(1, 0), (3, 3), (4, 4), (5, 5)])
+        self.assertIs(joined.as_series().data.seq, joined.as_series().data.seq)
+
+        self.assertRaises(TypeError, lambda: MaintainedJoin(kb, 5, lambda t, a, b: a))
+
+    def test_maintained_join_appends(self):
+        ka, kb = DiscreteSeriesBuilder(), DiscreteSeriesBuilder()
+        joined = MaintainedJoin(ka, kb, lambda t, a, b: a + b)
+
+        ka.put(0, 0)
+        kb.put(0, 0)
+        first = joined.as_series()
+        for i in range(1, 10):
+            ka.put(i, i)
+            kb.put(i, i)
+            series = joined.as_series()
+            self.assertIs(series.data.seq, first.data.seq)  # storage was not copied
+
+        self.assertEqual(series.data, [(i, 2 * i) for i in range(10)])
+        self.assertEqual(first.data, [(0, 0)])
+
+    def test_maintained_join_detach(self):
+        ka, kb = DiscreteSeriesBuilder(), DiscreteSeriesBuilder()
+        ka.put(0, 1)
+        kb.put(0, 2)
+        joined = MaintainedJoin(ka, kb, lambda t, a, b: a + b)
+        self.assertEqual(joined.as_series().data, [(0, 3)])
+
+        joined.close()
+        self.assertEqual((ka._watchers, kb._watchers), ([], []))
+        ka.put(1, 5)
+        kb.put(1, 5)
+        self.assertEqual(joined.as_series().data, [(0, 3)])
+
+        MaintainedJoin(ka, kb, lambda t, a, b: a * b)  # dropped right away
+        gc.collect()
+        self.assertEqual((ka._watchers, kb._watchers), ([], []))
+        ka.put(2, 0)
@@ -1,6 +1,6 @@
 import unittest
 
-from firanka.intervals import Interval
+from firanka.intervals import Interval, IntervalArray, EMPTY_SET, np, _parse
 
 
 class TestIntervals(unittest.TestCase):
@@ -18,6 +18,13 @@ class TestIntervals(unittest.TestCase):
             self.assertEqual(Interval(a).intersection(b), Interval(val))
             self.assertEqual(Interval(b).intersection(a), Interval(val))
 
+    def test_parse_cached(self):
+        Interval('<0;5.25)')
+        hits = _parse.cache_info().hits
+        self.assertEqual(Interval('<-1;6>').intersection('<0;5.25)'), Interval('<0;5.25)'))
+        self.assertEqual(_parse.cache_info().hits, hits + 2)
+        self.assertRaises(ValueError, lambda: Interval('<0;5'))
+
     def test_slicing(self):
         self.assertTrue(Interval('<-5;5>')[0:] == Interval('<0;5>'))
 
@@ -71,3 +78,44 @@ class TestIntervals(unittest.TestCase):
         self.assertTrue(Interval('<-5;5>') in Interval('<-10;10>'))
         self.assertTrue('(-1;6)' in Interval(-10.0, 10.0, True, False))
         self.assertTrue('<0.5;1.5>' in Interval('<0;2>'))
+
+
+@unittest.skipIf(np is None, 'numpy not installed')
+class TestIntervalArray(unittest.TestCase):
+    def test_base(self):
+        ia = IntervalArray.from_intervals(['<0;1)', '(1;3>', Interval(2, float('inf'))])
+
+        self.assertEqual(len(ia), 3)
+        self.assertEqual(list(ia), [Interval('<0;1)'), Interval('(1;3>'),
+                                    Interval(2, float('inf'), True, False)])
+        self.assertEqual(ia.length().tolist(), [1, 2, float('inf')])
+        self.assertEqual(list(ia.translate(1)), [Interval('<1;2)'), Interval('(2;4>'),
+                                                 Interval(3, float('inf'), True, False)])
+        self.assertEqual(list(ia[1:]), list(ia)[1:])
+        self.assertRaises(ValueError, lambda: IntervalArray([0], [float('inf')], True, True))
+
+    def test_contains(self):
+        ia = IntervalArray.from_intervals(['<0;1)', '(1;3>', '<5;5>'])
+
+        self.assertEqual(ia.contains(1).tolist(), [False, False, False])
+        self.assertEqual(ia.contains([0, 3, 5]).tolist(), [True, True, True])
+        self.assertEqual(ia.contains(np.array([1, 2])[:, None]).tolist(),
+                         [[False, False, False], [False, True, False]])
+
+    def test_intersection(self):
+        a = ['<-10;1>', '<-10;1>', '(-10;1)', '<0;2)', '<5;5>']
+        b = ['<2;3>', '<1;3>', '<-20;-10>', '(0;1>', '<0;1>']
+        ia = IntervalArray.from_intervals(a).intersection(IntervalArray.from_intervals(b))
+
+        self.assertEqual(list(ia), [Interval(x).intersection(y) for x, y in zip(a, b)])
+        self.assertEqual(ia.is_empty().tolist(), [True, False, True, False, True])
+        self.assertEqual(list(IntervalArray.from_intervals(a).intersection('<0;0.5)')),
+                         [Interval('<0;0.5)')] * 4 + [EMPTY_SET])
+
+    def test_union(self):
+        ia = IntervalArray.from_intervals(['<3;4)', '<0;1)', '(1;2>', '<0.5;1)', '<2;2.5)',
+                                           '(5;6)', '<4;4>', '(7;7)'])
+
+        self.assertEqual(list(ia.union()), [Interval('<0;1)'), Interval('(1;2.5)'),
+                                            Interval('<3;4>'), Interval('(5;6)')])
+        self.assertEqual(len(IntervalArray([], []).union()), 0)
@@ -5,6 +5,7 @@ from firanka.exceptions import NotInDomainError, DomainError
 from firanka.intervals import Interval
 from firanka.series import DiscreteSeries, FunctionSeries, ModuloSeries, \
     LinearInterpolationSeries, Series
+from firanka.series.base import AlteredSeries, JoinedSeries
 from .common import NOOP, HUGE_IDENTITY
 
 
@@ -44,6 +45,15 @@ class TestDiscreteSeries(unittest.TestCase):
         self.assertRaises(NotInDomainError, lambda: s[-1])
         self.assertEqual(s[2.5], 2)
 
+    def test_lookup_many_points(self):
+        s = DiscreteSeries([(i * 2, i) for i in range(1000)], '<0;2000)')
+
+        self.assertEqual(s[0], 0)
+        self.assertEqual(s[1], 0)
+        self.assertEqual(s[998], 499)
+        self.assertEqual(s[999.5], 499)
+        self.assertEqual(s[1999], 999)
+
     def test_translation(self):
         s = DiscreteSeries([[0, 0], [1, 1], [2, 2]]).translate(3)
 
@@ -82,6 +92,156 @@ class TestDiscreteSeries(unittest.TestCase):
         self.assertEqual(sc.eval_points([0, 1, 2]), [1, 3, 5])
         self.assertEqual(sc.data, [(0, 1), (1, 3), (2, 5)])
 
+    def test_join_merge(self):
+        sa = DiscreteSeries([(0, 0), (1, 1), (1, 2), (3, 3)], '<0;5>')
+        sb = DiscreteSeries([(0.5, 1), (2, 1), (4, 0)], '<0.5;4>')
+
+        sc = sa.join_discrete(sb, lambda i, a, b: a + b)
+        self.assertEqual(sc.domain, '<0.5;4>')
+        self.assertEqual(sc.data, [(0.5, 1), (1, 3), (3, 4), (4, 3)])
+        self.assertEqual(sa.join(FunctionSeries(NOOP, '<0;5>'), lambda i, a, b: b)[2.5], 2.5)
+
+    def test_eval_points_batch(self):
+        s = DiscreteSeries([(0, 0), (1, 1), (2, 2)], '<0;3)')
+
+        self.assertEqual(s.eval_points([2.5, 0, 1.5, 1, 0.5]), [2, 0, 1, 1, 0])
+        self.assertEqual(s.eval_points([]), [])
+        self.assertRaises(NotInDomainError, lambda: s.eval_points([1, 3]))
+        self.assertEqual(s.eval_points([-1, 1, 3], default=-1), [-1, 1, -1])
+        self.assertEqual(s.eval_points([-1, 1, 2], mask=True),
+                         ([None, 1, 2], [False, True, True]))
+
+        t = 1700000000 * 10 ** 9  # nanoseconds, too many digits for a float64
+        s = DiscreteSeries([(t, 'a'), (t + 10 ** 9, 'b')],
+                           Interval(t, t + 2 * 10 ** 9, True, False))
+        self.assertEqual(s.eval_points([t - 1, t + 5, t + 3 * 10 ** 9], default=None),
+                         [None, 'a', None])
+
+    def test_streaming(self):
+        s = DiscreteSeries([(0, 0), (1, 1), (2, 2)], '<0;3)')
+
+        values = s.iter_points(x / 4 for x in range(12))
+        self.assertEqual(next(values), 0)
+        self.assertEqual(list(values), [0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2])
+
+        self.assertEqual(list(s.stream_discretize((x / 4 for x in range(12)), chunksize=3)),
+                         [(0, 0), (1, 1), (2, 2)])
+        self.assertRaises(ValueError, lambda: list(s.stream_discretize([0, 2, 1])))
+        self.assertRaises(ValueError, lambda: list(s.stream_discretize([0, 2, 1], chunksize=2)))
+        self.assertRaises(NotInDomainError, lambda: list(s.iter_points([1, 3])))
+
+        points = [x / 4 for x in range(12)]
+        discrete = s.discretize(points)
+        streamed = DiscreteSeries(list(s.stream_discretize(points)), discrete.domain)
+        self.assertEqual(streamed.domain, discrete.domain)
+        self.assertEqual(streamed.eval_points(points), discrete.eval_points(points))
+        self.assertEqual(len(streamed.data), 3)
+        self.assertEqual(len(discrete.data), 12)
+
+    def test_resample(self):
+        s = DiscreteSeries([(0, 1), (0.5, 3), (2, 5), (2.5, 1)], '<0;4>')
+
+        self.assertEqual(s.resample(1).data, [(0, 2), (1, 3), (2, 3), (3, 1)])
+        self.assertEqual(s.resample(2, 'twmean').data, [(0, 2.5), (2, 2)])
+        self.assertEqual(s.resample(2, 'min').data, [(0, 1), (2, 1)])
+        self.assertEqual(s.resample(2, 'max').data, [(0, 3), (2, 5)])
+        self.assertEqual(s.resample(2, 'last').data, [(0, 3), (2, 1)])
+        self.assertEqual(s.resample(1, 'count').data, [(0, 2), (1, 0), (2, 2), (3, 0)])
+        self.assertEqual(s.resample(2, len).data, [(0, 2), (2, 2)])
+
+        shifted = s.resample(1.5, 'twmean', origin=-1)
+        self.assertEqual(shifted.domain, '<0;4>')
+        self.assertEqual(shifted.data, [(-1, 1), (0.5, 3), (2, 3.5 / 1.5), (3.5, 1)])
+
+        unbounded = DiscreteSeries([(0, 1), (2, 3)], '<0;inf)')
+        self.assertEqual(unbounded.resample(2, 'twmean').data, [(0, 1), (2, 3)])
+
+        self.assertRaises(ValueError, lambda: s.resample(0))
+        self.assertRaises(ValueError, lambda: s.resample(1, 'median'))
+        self.assertRaises(ValueError, lambda: s.resample(1, origin=5))
+        self.assertRaises(ValueError, lambda: DiscreteSeries(s.data, '<0;4)').resample(
+            1, origin=4))
+        self.assertEqual(s.resample(1, origin=4).data, [(4, 1)])
+        self.assertEqual(unbounded.resample(1, origin=5).data, [(5, 3)])
+        self.assertRaises(DomainError, lambda: DiscreteSeries([(0, 1)], '(-inf;1>').resample(1))
+
+    def test_rolling(self):
+        s = DiscreteSeries([(0, 1), (0.5, 3), (2, 5), (2.5, 1)], '<0;4>')
+
+        self.assertEqual(s.rolling(2).data, [(0, 1), (2, 2.5), (2.5, 3.5), (4, 2)])
+        self.assertEqual(s.rolling(1, 'max').data, [(0, 1), (0.5, 3), (2, 5), (3.5, 1)])
+        self.assertEqual(s.rolling(1, 'min').data, [(0, 1), (1.5, 3), (2.5, 1)])
+        self.assertEqual(s.rolling(1, 'sum').data, [(0, 1), (0.5, 4), (1, 3), (1.5, 0),
+                                                    (2, 5), (2.5, 6), (3, 1), (3.5, 0)])
+        self.assertEqual(s.rolling(1, 'count').data, [(0, 1), (0.5, 2), (1, 1), (1.5, 0),
+                                                      (2, 1), (2.5, 2), (3, 1), (3.5, 0)])
+        self.assertEqual(s.rolling(1, 'max').domain, s.domain)
+
+        sp = s[1:3]  # the value carried into the domain is not a point of it
+        self.assertEqual(sp.rolling(1, 'count').data, [(1, 0), (2, 1), (2.5, 2), (3, 1)])
+        self.assertEqual(sp.rolling(1, 'max').data, [(1, 3), (2, 5)])
+
+        self.assertRaises(ValueError, lambda: s.rolling(0))
+        self.assertRaises(ValueError, lambda: s.rolling(1, 'median'))
+        self.assertRaises(DomainError, lambda: DiscreteSeries([(0, 1)], '(-inf;1>').rolling(1))
+        self.assertRaises(TypeError, lambda: LinearInterpolationSeries(s.data).rolling(1))
+
+    def test_integrate(self):
+        s = DiscreteSeries([(0, 1), (1, 3), (3, -1)], '<0;5>')
+
+        self.assertEqual(s.integrate('<0;5>'), 1 + 6 - 2)
+        self.assertEqual(s.integrate(Interval(0.5, 3.5)), 0.5 + 6 - 0.5)
+        self.assertEqual(s.integrate('<2;2>'), 0)
+        self.assertEqual(s.mean('<1;3)'), 3)
+        self.assertEqual(s.mean('<0;2>'), 2)
+        self.assertEqual(s.mean('<4;4>'), -1)
+        self.assertRaises(NotInDomainError, lambda: s.integrate('<-1;2>'))
+        self.assertRaises(TypeError, lambda: LinearInterpolationSeries(s).integrate('<0;1>'))
+
+    def test_unchecked(self):
+        s = DiscreteSeries([(0, 1), (1, 2)], '<0;2)')
+
+        get = s.unchecked('<0;1>')
+        self.assertEqual([get(0), get(0.5), get(1)], [1, 1, 2])
+        self.assertEqual(s.unchecked()(1.5), 2)
+        self.assertRaises(NotInDomainError, lambda: s.unchecked('<0;3>'))
+        self.assertRaises(NotInDomainError, lambda: s[2])
+
+    def test_slice_is_view(self):
+        s = DiscreteSeries([(0, 1), (1, 2), (2, 3), (3, 4)], '<0;5>')
+        s.integrate('<0;1>')
+
+        sl = s[0.5:2.5]
+        self.assertIsInstance(sl, DiscreteSeries)
+        self.assertIs(sl.data.seq, s.data)
+        self.assertEqual(sl.domain, Interval('<0.5;2.5>'))
+        self.assertEqual(list(sl.data), [(0, 1), (1, 2), (2, 3)])
+        self.assertEqual(sl[0.5], 1)
+        self.assertEqual(sl[2.5], 3)
+        self.assertEqual(sl.integrate('<1;2.5>'), 3.5)
+        self.assertRaises(NotInDomainError, lambda: sl[3])
+
+        sl2 = sl[1:2]
+        self.assertIs(sl2.data.seq, s.data)
+        self.assertEqual(list(sl2.data), [(1, 2), (2, 3)])
+        self.assertEqual(sl2.max('<1;1.5>'), 2)
+
+    def test_range_queries(self):
+        s = DiscreteSeries([(0, 1), (1, 3), (2, -1), (3, 3), (4, 0)], '<0;5>')
+
+        self.assertEqual(s.max('<0;5>'), 3)
+        self.assertEqual(s.argmax('<0;5>'), 1)
+        self.assertEqual(s.min('<0;5>'), -1)
+        self.assertEqual(s.argmin('<0;5>'), 2)
+        self.assertEqual(s.max('<2;3)'), -1)
+        self.assertEqual(s.max('<2;3>'), 3)
+        self.assertEqual(s.argmax('<2.5;3.5>'), 3)
+        self.assertEqual(s.argmin(Interval(0.5, 1.5)), 0.5)
+        self.assertEqual(s.min('<4.5;4.5>'), 0)
+        self.assertRaises(NotInDomainError, lambda: s.max('<-1;2>'))
+        self.assertRaises(ValueError, lambda: s.max(Interval(2, 2, False, False)))
+        self.assertRaises(TypeError, lambda: LinearInterpolationSeries(s).max('<0;1>'))
+
     def test_eval2(self):
         sa = DiscreteSeries([[0, 0], [1, 1], [2, 2]])
         sb = FunctionSeries(NOOP, '<0;2>')
@@ -141,6 +301,52 @@ class TestDiscreteSeries(unittest.TestCase):
         self.assertTrue(empty.domain.is_empty())
 
 
+class TestOptimize(unittest.TestCase):
+    def test_fuse_altered(self):
+        series = FunctionSeries(NOOP, '<0;10>')
+        chain = series.translate(1).apply(lambda k, v: v * 2)[2:5].translate(2) \
+            .apply(lambda k, v: v + k)
+        optimized = chain.optimize()
+
+        self.assertEqual(optimized.domain, chain.domain)
+        self.assertEqual(optimized.domain, '<4;7>')
+        self.assertIsInstance(optimized, AlteredSeries)
+        self.assertIsInstance(optimized.series, FunctionSeries)
+        self.assertEqual(optimized.series.domain, '<1;4>')
+        self.assertEqual(FunctionSeries(NOOP, '<0;10>', comment='x')[2:5].optimize().comment,
+                         'x')
+        self.assertEqual(chain.eval_points([4, 5.5, 7]), [2 + 4, 5 + 5.5, 8 + 7])
+        self.assertEqual(optimized.eval_points([4, 5.5, 7]), chain.eval_points([4, 5.5, 7]))
+
+    def test_collapse_discrete(self):
+        series = DiscreteSeries([(0, 0), (1, 1), (2, 2), (3, 3)], '<0;4>')
+        chain = series[0.5:2.5].translate(1).apply(lambda k, v: v * 10)
+        optimized = chain.optimize()
+
+        self.assertIsInstance(optimized, DiscreteSeries)
+        self.assertEqual(optimized.domain, '<1.5;3.5>')
+        self.assertEqual(optimized.data, [(1, 0), (2, 10), (3, 20)])
+
+    def test_push_slice_into_join(self):
+        sa = DiscreteSeries([(0, 0), (1, 1), (2, 2)], '<0;3>')
+        sb = ModuloSeries(DiscreteSeries([(0, 1), (1, 2)], '<0;2)'))
+        sc = FunctionSeries(NOOP, '<0;3>')
+
+        joined = sa.join(sc, lambda i, a, b: a + b).join(sb, lambda i, a, b: a * b)[1:2]
+        optimized = joined.optimize()
+
+        self.assertIsInstance(optimized, JoinedSeries)
+        self.assertEqual(optimized.domain, '<1;2>')
+        self.assertEqual(optimized.ser1.ser2.domain, '<1;2>')
+        self.assertIs(optimized.ser2, sb)
+        self.assertEqual(optimized.eval_points([1, 1.5, 2]), joined.eval_points([1, 1.5, 2]))
+
+        discrete = sa.join(DiscreteSeries([(0, 1), (2, 2)], '<0;3>'), lambda i, a, b: a * b)
+        self.assertIsInstance(discrete, DiscreteSeries)
+        self.assertIsInstance(JoinedSeries(sa, discrete, lambda i, a, b: a + b).optimize(),
+                              DiscreteSeries)
+
+
 class TestFunctionSeries(unittest.TestCase):
     def test_slice(self):
         series = FunctionSeries(NOOP, '<0;2>')
@@ -159,6 +365,35 @@ class TestFunctionSeries(unittest.TestCase):
 
         self.assertEqual(series.eval_points(PTS), [x for x in PTS])
 
+    def test_translate(self):
+        series = FunctionSeries(NOOP, '<0;2>').translate(1)
+
+        self.assertEqual(series.domain, '<1;3>')
+        self.assertEqual(series[1], 0)
+        self.assertEqual(series[3], 2)
+
+    def test_translate_direction(self):
+        # a translated series looks up t - x, like DiscreteSeries.translate moves points
+        # by x. AlteredSeries used to look up t + x, outside of its own domain.
+        discrete = DiscreteSeries([(0, 0), (1, 1), (2, 2)], '<0;3)')
+        function = FunctionSeries(math.floor, '<0;3)')
+        points = [0.5, 1, 2.5]
+
+        for x in (2, -1.5):
+            moved = [p + x for p in points]
+            self.assertEqual(function.translate(x).domain, discrete.translate(x).domain)
+            self.assertEqual(function.translate(x).eval_points(moved), [0, 1, 2])
+            self.assertEqual(discrete.translate(x).eval_points(moved), [0, 1, 2])
+            self.assertEqual(function.translate(x)[1 + x], 1)
+            self.assertEqual(function.translate(x).optimize()[1 + x], 1)
+
+    def test_eval_points_altered(self):
+        series = FunctionSeries(NOOP, '<-5;5>').apply(lambda k, x: x * 2)
+        joined = series.join(HUGE_IDENTITY, lambda i, x, y: x + y)
+
+        self.assertEqual(series.eval_points([3, -1, 6], default=0), [6, -2, 0])
+        self.assertEqual(joined.eval_points([1, 2]), [3, 6])
+
     def test_apply_wild(self):
         def dzika(k, x, a=5, *args, **kwargs):
             return k
@@ -204,6 +439,49 @@ class TestModuloSeries(unittest.TestCase):
         self.assertEqual(series.eval_points([-5, -4, -3, -2, -1, 0, 1, 2, 3, 4, 5]),
                          [3, 1, 2, 3, 1, 2, 3, 1, 2, 3, 1])
 
+    def test_eval_points_batch(self):
+        series = ModuloSeries(DiscreteSeries([(-1, 1), (0, 2), (1, 3)], '<-1;2)'))
+        points = [-7.5, 100, -1, 2, 0.5, 3.25, -0.001]
+
+        self.assertEqual(series.eval_points(points), [series[p] for p in points])
+
+        series = ModuloSeries(FunctionSeries(lambda x: x * 2, '<0;3)'))
+        self.assertEqual(series.eval_points(points), [series[p] for p in points])
+
+    def test_eval_points_ints(self):
+        day = 86400 * 10 ** 9  # in nanoseconds, too many digits for a float64
+        series = ModuloSeries(DiscreteSeries([(0, 'night'), (8 * 3600 * 10 ** 9, 'day'),
+                                              (20 * 3600 * 10 ** 9, 'night')],
+                                             Interval(0, day, True, False)))
+        t = 19700 * day + 8 * 3600 * 10 ** 9 - 1
+
+        self.assertEqual(series[t], 'night')
+        self.assertEqual(series.eval_points([t, t + 1]), ['night', 'day'])
+
+        series = ModuloSeries(FunctionSeries(lambda x: 'abc'[x], Interval(0, 3, True, False)))
+        self.assertEqual(series.eval_points([4, 5, -1]), ['b', 'c', 'c'])
+        self.assertEqual(series.discretize([0, 1, 2]).data, [(0, 'a'), (1, 'b'), (2, 'c')])
+        self.assertRaises(ValueError, lambda: series.discretize(domain='<0;6)'))
+        self.assertRaises(ValueError, lambda: series.discretize(Interval('<0;6)')))
+
+        points = [t, t + 1, 19700 * day - 1, 2 ** 62 + 1, 2 ** 70]  # int64 and beyond
+        series = ModuloSeries(DiscreteSeries([(0, 'a'), (1, 'b'), (day // 2, 'c')],
+                                             Interval(0, day, True, False)))
+        self.assertEqual(series.eval_points(points), [series[p] for p in points])
+
+    def test_discretize_unrolled(self):
+        series = ModuloSeries(DiscreteSeries([(-1, 1), (0, 2), (0.5, 2), (1, 3)], '<-1;2)'))
+
+        unrolled = series.discretize(Interval('<-4.5;1>'))
+        self.assertEqual(unrolled.domain, Interval('<-4.5;1>'))
+        self.assertEqual(list(unrolled.data), [(-4.5, 3), (-4, 1), (-3, 2), (-2, 3),
+                                               (-1, 1), (0, 2), (1, 3)])
+
+        unrolled = series.discretize(domain='<0;3)')
+        self.assertEqual(list(unrolled.data), [(0, 2), (1, 3), (2, 1)])
+        self.assertRaises(ValueError, lambda: series.discretize(Interval('<0;inf)')))
+        self.assertEqual(series.discretize([0, 1.5]).data, [(0, 2), (1.5, 3)])
+
     def test_comp_discrete(self):
         ser1 = ModuloSeries(FunctionSeries(lambda x: x ** 2, '<0;3)'))
         ser2 = FunctionSeries(NOOP, '<0;3)')
@@ -220,6 +498,7 @@ class TestLinearInterpolation(unittest.TestCase):
         self.assertEqual(series[0.5], 1.5)
         self.assertEqual(series[1], 2)
         self.assertEqual(series[2.3], 3)
+        self.assertEqual(series.eval_points([2.3, 0.5, 0, 1]), [3, 1.5, 1, 2])
 
     def test_conf(self):
         self.assertRaises(TypeError, lambda: LinearInterpolationSeries(
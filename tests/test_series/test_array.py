@@ -0,0 +1,102 @@
+import unittest
+
+from firanka.exceptions import NotInDomainError
+from firanka.intervals import Interval
+from firanka.series import DiscreteSeries, ArrayDiscreteSeries, FunctionSeries
+from firanka.series.array import np
+from .common import NOOP
+
+
+@unittest.skipIf(np is None, 'numpy not installed')
+class TestArrayDiscreteSeries(unittest.TestCase):
+    def test_base(self):
+        s = ArrayDiscreteSeries([0, 1, 2], [0, 1, 2], '<0;3)')
+
+        self.assertEqual(s[0], 0)
+        self.assertEqual(s[0.5], 0)
+        self.assertEqual(s[2.5], 2)
+        self.assertRaises(NotInDomainError, lambda: s[3])
+        self.assertEqual(s.eval_points([2.5, 0.5, 1]), [2, 0, 1])
+        self.assertEqual(s.data, [(0, 0), (1, 1), (2, 2)])
+        self.assertRaises(ValueError, lambda: ArrayDiscreteSeries([1, 0], [0, 1]))
+
+    def test_zero_copy(self):
+        index = np.arange(5, dtype=np.float64)
+        values = np.arange(5) * 2
+        s = ArrayDiscreteSeries(index, values)
+
+        self.assertIs(s.index, index)
+        self.assertIs(s.values, values)
+        self.assertIs(s.translate(1).values, values)
+        self.assertIs(s[1:3].index.base, index)
+
+        b = ArrayDiscreteSeries.frombuffer(index.tobytes(), values.astype(np.float64).tobytes())
+        self.assertEqual(b[3.5], 6)
+
+    def test_object_values(self):
+        s = ArrayDiscreteSeries([0, 1], [[1, 2], 'a'])
+
+        self.assertEqual(s.values.dtype, object)
+        self.assertEqual(s[0.5], [1, 2])
+        self.assertEqual(s[1], 'a')
+
+    def test_apply_translate_slice(self):
+        s = ArrayDiscreteSeries.from_series(DiscreteSeries([(0, 0), (1, 1), (2, 2)]))
+
+        self.assertEqual(s.apply(lambda k, v: v * 2).data, [(0, 0), (1, 2), (2, 4)])
+        self.assertEqual(s.apply(lambda k, v: v + k, vectorized=True).data,
+                         [(0, 0), (1, 2), (2, 4)])
+        self.assertEqual(s.translate(1)[1.5], 0)
+
+        sp = s[0.5:1.5]
+        self.assertIsInstance(sp, ArrayDiscreteSeries)
+        self.assertEqual(sp[0.5], 0)
+        self.assertEqual(sp[1.5], 1)
+        self.assertRaises(NotInDomainError, lambda: sp[2])
+
+    def test_join_discrete(self):
+        sa = ArrayDiscreteSeries([0, 1, 2], [0, 1, 2])
+        sb = DiscreteSeries([(0, 1), (1, 2), (2, 3)])
+
+        self.assertEqual(sa.join_discrete(sb, lambda i, a, b: a + b).data,
+                         [(0, 1), (1, 3), (2, 5)])
+        self.assertEqual(sa.join_discrete(FunctionSeries(NOOP, '<0;2>'),
+                                          lambda i, a, b: a + b).data,
+                         [(0, 0), (1, 2), (2, 4)])
+
+    def test_join_vectorized(self):
+        sa = ArrayDiscreteSeries([0, 1, 2, 3], [0, 1, 1, 2], '<0;5>')
+        sb = ArrayDiscreteSeries([0.5, 2, 4], [1, 0, 2], '<0.5;4>')
+
+        joined = sa.join_discrete(sb, lambda i, a, b: a + b, vectorized=True)
+
+        self.assertIsInstance(joined, ArrayDiscreteSeries)
+        self.assertEqual(joined.domain, '<0.5;4>')
+        self.assertEqual(joined.data, [(0.5, 1), (1, 2), (2, 1), (3, 2), (4, 4)])
+        self.assertEqual(sa.join_discrete(sb, lambda i, a, b: a + b).data, joined.data)
+        self.assertEqual(DiscreteSeries(sa.data, sa.domain).join_discrete(
+            DiscreteSeries(sb.data, sb.domain), lambda i, a, b: a + b).data, joined.data)
+
+    def test_resample(self):
+        s = DiscreteSeries([(0, 1), (0.5, 3), (2, 5), (2.5, 1), (3.5, 2)], '<0;5)')
+        a = ArrayDiscreteSeries.from_series(s)
+
+        for agg in ('mean', 'twmean', 'min', 'max', 'last', 'count'):
+            for origin in (None, -0.25, 1):
+                resampled = a.resample(1.5, agg, origin)
+                self.assertIsInstance(resampled, ArrayDiscreteSeries)
+                self.assertEqual(resampled.data, s.resample(1.5, agg, origin).data)
+
+    def test_integrate(self):
+        s = ArrayDiscreteSeries([0, 1, 3], [1, 3, -1], '<0;5>')
+
+        self.assertEqual(s.integrate('<0;5>'), 5)
+        self.assertEqual(s.mean(Interval(0.5, 3.5)), 6 / 3)
+
+    def test_range_queries(self):
+        s = ArrayDiscreteSeries([0, 1, 2, 3], [1, 3, -1, 3], '<0;5>')
+
+        self.assertEqual(s.max('<0;5>'), 3)
+        self.assertEqual(s.argmax('<0;5>'), 1)
+        self.assertEqual(s.min('<2.5;5>'), -1)
+        self.assertEqual(s.argmin('<2.5;5>'), 2.5)
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from firanka.exceptions import NotInDomainError
+from firanka.series import AsyncFunctionSeries, CachedSeries, DiscreteSeries, \
+    ModuloSeries, SeriesBundle
+
+
+class Stub(object):
+    """A coroutine function standing in for a service, recording how it's awaited"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+
+    async def __call__(self, x):
+        self.calls.append(x)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.001)
+        self.active -= 1
+        if isinstance(x, list):
+            return [v * 2 for v in x]
+        return x * 2
+
+
+class TestAsyncFunctionSeries(unittest.TestCase):
+    def test_concurrency(self):
+        stub = Stub()
+        series = AsyncFunctionSeries(stub, '<0;100>', concurrency=3)
+
+        self.assertEqual(asyncio.run(series.eval_points_async(range(10))),
+                         [i * 2 for i in range(10)])
+        self.assertEqual(stub.peak, 3)
+        self.assertEqual(sorted(stub.calls), list(range(10)))
+
+    def test_batches(self):
+        stub = Stub()
+        series = AsyncFunctionSeries(stub, '<0;100>', batch_size=4)
+
+        self.assertEqual(asyncio.run(series.eval_points_async([5, 1, 2, 3, 4, 6])),
+                         [10, 2, 4, 6, 8, 12])
+        self.assertEqual(stub.calls, [[5, 1, 2, 3], [4, 6]])
+
+    def test_sync(self):
+        series = AsyncFunctionSeries(Stub(), '<0;100>')
+
+        self.assertEqual(series[3], 6)
+        self.assertEqual(series.eval_points([1, 2]), [2, 4])
+
+        async def inside_loop():
+            return series[3]
+
+        self.assertRaises(RuntimeError, lambda: asyncio.run(inside_loop()))
+        self.assertEqual(asyncio.run(series.discretize_async([2, 1], '<1;5>')).data,
+                         series.discretize([2, 1], '<1;5>').data)
+        self.assertEqual(asyncio.run(series.discretize_async([])).data, [])
+
+    def test_domain(self):
+        series = AsyncFunctionSeries(Stub(), '<0;100>')
+
+        self.assertEqual(asyncio.run(series.eval_points_async([1, 200], default=None)),
+                         [2, None])
+        self.assertRaises(NotInDomainError,
+                          lambda: asyncio.run(series.eval_points_async([1, 200])))
+
+    def test_composed(self):
+        stub = Stub()
+        series = AsyncFunctionSeries(stub, '<0;100>', batch_size=10)
+        discrete = DiscreteSeries([(0, 1), (50, 2)], '<0;100>')
+
+        joined = series.join(discrete, lambda t, x, y: x + y).translate(1).apply(
+            lambda t, v: -v)
+        self.assertEqual(asyncio.run(joined.eval_points_async([1, 2, 61])),
+                         [-1, -3, -122])
+
+        bundle = SeriesBundle(CachedSeries(series), discrete)
+        self.assertEqual(asyncio.run(bundle.eval_points_async([1, 1, 60])),
+                         [[2, 1], [2, 1], [120, 2]])
+
+        modulo = ModuloSeries(series)
+        self.assertEqual(asyncio.run(modulo.eval_points_async([150])), [100])
+
+        self.assertEqual(asyncio.run(series.discretize_async([2, 0])).data,
+                         [(0, 0), (2, 4)])
+        self.assertEqual(len(stub.calls), 4)
@@ -1,6 +1,8 @@
 import unittest
 
-from firanka.series import DiscreteSeries, FunctionSeries, SeriesBundle, DiscreteSeriesBundle
+from firanka.series import DiscreteSeries, FunctionSeries, SeriesBundle, DiscreteSeriesBundle, \
+    ArrayDiscreteSeries, ArrayDiscreteSeriesBundle, LinearInterpolationSeries
+from firanka.series.array import np
 from .common import NOOP
 
 
@@ -13,6 +15,7 @@ class TestBundles(unittest.TestCase):
 
         self.assertEqual(s[0], [1, 2])
         self.assertEqual(s[3], [1, 4])
+        self.assertEqual(s.eval_points([3, 0]), [[1, 4], [1, 2]])
 
     def test_disc(self):
         self.assertRaises(TypeError, lambda: DiscreteSeriesBundle(
@@ -36,6 +39,56 @@ class TestBundles(unittest.TestCase):
 
         p = s.compose()
 
-        self.assertEqual(p.data,
-                         [(0, [1, 2]), (1, [1, 2]), (1.5, [1, 2]), (2, [1, 2]), (2.5, [1, 2]),
-                          (3, [1, 4])])
+        self.assertEqual(p.data, [(0, [1, 2]), (3, [1, 4])])
+
+    def test_compose_columnar(self):
+        s = DiscreteSeriesBundle(
+            DiscreteSeries([(-1, 0), (0, 1), (1, 3), (2.5, 1)], '<0.5;inf)'),
+            DiscreteSeries([(0, 2), (1.5, 2), (2, 2), (3, 4)], '<0;inf)'),
+        )
+
+        self.assertEqual(s.compose(columnar=True),
+                         ([0.5, 1, 2.5, 3], [[1, 3, 1, 1], [2, 2, 2, 4]]))
+        self.assertEqual(s.compose().data,
+                         [(0.5, [1, 2]), (1, [3, 2]), (2.5, [1, 2]), (3, [1, 4])])
+
+
+@unittest.skipIf(np is None, 'numpy not installed')
+class TestArrayBundles(unittest.TestCase):
+    def test_shared_index(self):
+        s = ArrayDiscreteSeriesBundle.from_columns([0, 1, 2], [[1, 2, 3], [10, 20, 30]],
+                                                   '<0;5>')
+
+        self.assertTrue(s.values.flags['F_CONTIGUOUS'])
+        self.assertEqual(s[1.5].tolist(), [2, 20])
+        self.assertTrue(np.shares_memory(s[1.5], s.values))
+        self.assertEqual([row.tolist() for row in s.eval_points([5, 0])], [[3, 30], [1, 10]])
+        self.assertIs(s.series[1].index, s.index)
+
+        ints = ArrayDiscreteSeries([0, 1], np.array([1, 2]))
+        mixed = ArrayDiscreteSeriesBundle(ints, ArrayDiscreteSeries(ints.index, [0.5, 1.5]))
+        self.assertIs(mixed.index, ints.index)
+        self.assertEqual(mixed.values.dtype, np.float64)  # values are copied and converted
+        self.assertFalse(np.shares_memory(mixed.values, ints.values))
+
+    def test_aligned(self):
+        s = ArrayDiscreteSeriesBundle(
+            DiscreteSeries([(0, 1), (1, 2), (2, 3)], '<0;5>'),
+            DiscreteSeries([(-1, 5), (0.5, 6), (3, 7.5)], '<0.2;4>'),
+        )
+
+        self.assertEqual(s.domain, '<0.2;4>')
+        self.assertEqual(s.index.tolist(), [0.2, 0.5, 1, 2, 3])
+        self.assertEqual(s.values.tolist(), [[1, 5], [1, 6], [2, 6], [3, 6], [3, 7.5]])
+        self.assertEqual(s.compose().data,
+                         DiscreteSeriesBundle(*s.series).compose().data)
+        self.assertRaises(TypeError, lambda: ArrayDiscreteSeriesBundle(
+            LinearInterpolationSeries([(0, 1), (1, 2)])))
+        self.assertRaises(ValueError, lambda: ArrayDiscreteSeriesBundle())
+
+    def test_join_columns(self):
+        s = ArrayDiscreteSeriesBundle.from_columns([0, 1, 2, 3], [[1, 2, 3, 1], [3, 2, 1, 1]])
+
+        self.assertEqual(list(s.join_columns(lambda t, a, b: a + b).data), [(0, 4), (3, 2)])
+        self.assertEqual(list(s.join_columns(lambda t, a, b: a * b, vectorized=True).data),
+                         [(0, 3), (1, 4), (2, 3), (3, 1)])
@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+
+from firanka.exceptions import NotInDomainError
+from firanka.series import CachedSeries, FunctionSeries
+
+
+class Counting(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, x):
+        self.calls += 1
+        return x * 2
+
+
+class TestCachedSeries(unittest.TestCase):
+    def test_base(self):
+        fun = Counting()
+        s = CachedSeries(FunctionSeries(fun, '<0;10>'), maxsize=2)
+
+        self.assertEqual(s[1], 2)
+        self.assertEqual(s[1], 2)
+        self.assertEqual(s[2], 4)
+        self.assertEqual(s[3], 6)  # evicts 1
+        self.assertEqual(s[1], 2)
+        self.assertEqual(fun.calls, 4)
+        self.assertEqual((s.hits, s.misses), (1, 4))
+        self.assertRaises(NotInDomainError, lambda: s[11])
+
+        s.clear()
+        self.assertEqual((s.hits, s.misses), (0, 0))
+
+    def test_batch(self):
+        fun = Counting()
+        s = CachedSeries(FunctionSeries(fun, '<0;10>'))
+
+        self.assertEqual(s.eval_points([1, 2, 1]), [2, 4, 2])
+        self.assertEqual(s.eval_points([2, 3]), [4, 6])
+        self.assertEqual(fun.calls, 3)
+        self.assertEqual((s.hits, s.misses), (2, 3))
+
+    def test_quantum_and_ttl(self):
+        fun = Counting()
+        s = CachedSeries(FunctionSeries(fun, '<0;10>'), quantum=1)
+
+        self.assertEqual(s[1.5], 3)
+        self.assertEqual(s[1.7], 3)
+        self.assertEqual(fun.calls, 1)
+
+        s = CachedSeries(FunctionSeries(fun, '<0;10>'), ttl=0.01)
+        s[1]
+        time.sleep(0.02)
+        s[1]
+        self.assertEqual(s.misses, 2)
+
+    def test_threads(self):
+        s = CachedSeries(FunctionSeries(Counting(), '<0;1000>'), maxsize=100)
+
+        def hammer():
+            for i in range(1000):
+                self.assertEqual(s[i % 150], (i % 150) * 2)
+
+        threads = [threading.Thread(target=hammer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(s.hits + s.misses, 4000)
+        self.assertLessEqual(len(s._cache), 100)
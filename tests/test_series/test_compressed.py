@@ -0,0 +1,64 @@
+import pickle
+import unittest
+
+from firanka.exceptions import NotInDomainError
+from firanka.intervals import Interval
+from firanka.series import CompressedDiscreteSeries, DiscreteSeries
+from firanka.series import compressed
+
+
+class TestCompressedDiscreteSeries(unittest.TestCase):
+    def setUp(self):
+        self.data = [(i * 60.0, 20 + (i // 7) * 0.5) for i in range(100)] + \
+                    [(6001.5, -1e300), (6002, 3)]
+        self.plain = DiscreteSeries(self.data, '<0;7000>')
+        self.series = CompressedDiscreteSeries(self.data, '<0;7000>', block_size=16,
+                                               cache_blocks=2)
+
+    def test_base(self):
+        self.assertEqual(list(self.series.data), self.data)
+        self.assertEqual(len(self.series.data), 102)
+        self.assertEqual(self.series.data[17], self.data[17])
+        self.assertEqual(self.series.data[-1], (6002, 3))
+        self.assertEqual(self.series[0], 20)
+        self.assertEqual(self.series[6001.6], -1e300)
+        self.assertEqual(self.series[7000], 3)
+        self.assertRaises(NotInDomainError, lambda: self.series[-1])
+        self.assertEqual(CompressedDiscreteSeries([]).domain, Interval(0, 0, False, False))
+
+    def test_ints(self):
+        data = [(0, -2 ** 63), (1, 2 ** 63 - 1), (2.5, 0)]
+        self.assertEqual(list(CompressedDiscreteSeries(data).data), data)
+        self.assertRaises(TypeError, lambda: CompressedDiscreteSeries([(0, 'a')]))
+        self.assertRaises(TypeError, lambda: CompressedDiscreteSeries([(0, True)]))
+        self.assertRaises(TypeError, lambda: CompressedDiscreteSeries([(0, 2 ** 64)]))
+
+    def test_lookups_decode_only_their_blocks(self):
+        points = [59.5, 1000, 6001.6, 30, 1020]
+        self.assertEqual(self.series.eval_points(points), self.plain.eval_points(points))
+        self.assertEqual(list(self.series._blocks._cache), [1, 6])
+
+    def test_as_discrete(self):
+        sl = self.series[100:1000]
+        self.assertEqual(list(sl.data), list(self.plain[100:1000].data))
+        self.assertEqual(sl[150], self.plain[150])
+
+        other = DiscreteSeries([(0, 1), (3000.5, 2)], '<0;7000>')
+        self.assertEqual(list(self.series.join_discrete(other, lambda t, a, b: a * b).data),
+                         list(self.plain.join_discrete(other, lambda t, a, b: a * b).data))
+        self.assertEqual(self.series.integrate('<0;6002>'), self.plain.integrate('<0;6002>'))
+        self.assertEqual(list(self.series.data.islice(30, 40)), self.data[30:40])
+
+    def test_pickle(self):
+        self.series[0]
+        series = pickle.loads(pickle.dumps(self.series))
+        self.assertEqual(list(series.data), self.data)
+        self.assertEqual(series[6001.6], -1e300)
+
+    def test_without_numpy(self):
+        np, compressed.np = compressed.np, None
+        try:
+            series = CompressedDiscreteSeries(self.data, block_size=16)
+            self.assertEqual(list(series.data), self.data)
+        finally:
+            compressed.np = np
@@ -0,0 +1,68 @@
+import asyncio
+import io
+import pickle
+import unittest
+
+from firanka.series import CachedSeries, DiscreteSeries, FunctionSeries
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.discrete = DiscreteSeries([(0, 1), (1, 2), (2, 3)], '<0;3)')
+        self.function = FunctionSeries(lambda x: x * 2, '<0;3)')
+        self.cached = CachedSeries(self.function)
+        self.joined = self.discrete.join(self.cached, lambda t, a, b: a + b)[0:2]
+
+    def test_disabled(self):
+        self.assertIsNone(self.joined.stats)
+        self.assertNotIn('_get_for', self.joined.__dict__)
+
+        out = io.StringIO()
+        self.joined.explain(out)
+        self.assertEqual(out.getvalue(),
+                         'AlteredSeries <0.0;2>\n'
+                         '  JoinedSeries <0.0;3.0)\n'
+                         '    DiscreteSeries <0.0;3.0), 3 points\n'
+                         '    CachedSeries <0.0;3.0), hits=0 misses=0 (0% hit rate)\n'
+                         '      FunctionSeries <0.0;3.0)\n')
+
+    def test_stats(self):
+        self.joined.instrument()
+        self.assertEqual(self.joined.eval_points([0, 0.5, 1, 0.5]), [1, 2, 4, 2])
+        self.assertEqual(self.joined[1.5], 5)
+
+        stats = self.joined.stats
+        self.assertEqual((stats.calls, stats.points), (2, 5))
+        self.assertEqual((self.discrete.stats.calls, self.discrete.stats.points), (2, 5))
+        self.assertEqual((self.function.stats.calls, self.function.stats.points), (2, 4))
+        self.assertGreaterEqual(stats.time, self.joined.series.stats.time)
+        self.assertAlmostEqual(stats.self_time,
+                               stats.time - self.joined.series.stats.time)
+
+        out = io.StringIO()
+        self.joined.explain(out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('AlteredSeries <0.0;2>: calls=2 points=5 total='))
+        self.assertIn('hits=1 misses=4 (20% hit rate): calls=2 points=5', lines[3])
+
+        self.joined.instrument(False)
+        self.assertNotIn('_get_for', self.discrete.__dict__)
+        self.assertEqual(self.joined[1.5], 5)
+        self.assertEqual(stats.calls, 2)
+
+    def test_async(self):
+        self.joined.instrument()
+        self.assertEqual(asyncio.run(self.joined.eval_points_async([0, 0.5, 1])), [1, 2, 4])
+
+        stats = self.joined.stats
+        self.assertEqual((stats.calls, stats.points), (1, 3))
+        self.assertEqual((self.discrete.stats.calls, self.discrete.stats.points), (1, 3))
+        self.assertEqual((self.function.stats.calls, self.function.stats.points), (1, 3))
+        self.assertGreater(stats.child_time, 0)
+
+    def test_pickle(self):
+        self.discrete.instrument()
+        discrete = pickle.loads(pickle.dumps(self.discrete))
+
+        self.assertIsNone(discrete.stats)
+        self.assertEqual(discrete[1], 2)
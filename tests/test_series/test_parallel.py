@@ -0,0 +1,47 @@
+import concurrent.futures
+import pickle
+import unittest
+
+from firanka.builders import DiscreteSeriesBuilder
+from firanka.series import FunctionSeries, DiscreteSeries, CachedSeries, ModuloSeries
+
+
+def square(x):
+    return x ** 2
+
+
+def add(i, a, b):
+    return a + b
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.series = FunctionSeries(square, '<-100;100>').join(
+            ModuloSeries(DiscreteSeries([(0, 1), (1, 2)], '<0;2)')), add)
+
+    def test_threads(self):
+        points = [x / 10 for x in range(-1000, 1000, 7)]
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            self.assertEqual(self.series.eval_points(points, executor=executor, chunksize=13),
+                             self.series.eval_points(points))
+            self.assertEqual(self.series.discretize(points[::-1], executor=executor).data,
+                             self.series.discretize(points).data)
+
+    def test_processes(self):
+        points = list(range(-100, 100))
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            self.assertEqual(self.series.discretize(points, executor=executor).data,
+                             self.series.discretize(points).data)
+
+    def test_pickle(self):
+        kb = DiscreteSeriesBuilder()
+        for i in range(10):
+            kb.put(i, i)
+        snapshot = kb.as_series()[2:5].translate(1)
+
+        cached = CachedSeries(snapshot)
+        cached[3]
+
+        restored = pickle.loads(pickle.dumps(cached))
+        self.assertEqual((restored.hits, restored.misses), (0, 0))
+        self.assertEqual(restored.eval_points([3, 4.5, 6]), [2, 3, 5])
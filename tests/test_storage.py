@@ -0,0 +1,68 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from firanka import storage
+from firanka.series import DiscreteSeries, ArrayDiscreteSeries
+from firanka.series.array import np
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'series.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_roundtrip(self):
+        series = DiscreteSeries([(0, 1), (1.5, 2), (3, -4)], '(0;5)')
+        storage.save(series, self.path)
+
+        opened = storage.open(self.path)
+        self.assertEqual(opened.domain, '(0;5)')
+        self.assertEqual(opened.data, [(0, 1), (1.5, 2), (3, -4)])
+        self.assertEqual(opened[1.5], 2)
+        self.assertEqual(opened.eval_points([4, 1]), [-4, 1])
+        self.assertEqual(opened[1:4].eval_points([1, 3.5]), [1, -4])
+        self.assertEqual(opened.join_discrete(series, lambda i, a, b: a + b).data,
+                         [(0, 2), (1.5, 4), (3, -8)])
+
+        unpickled = pickle.loads(pickle.dumps(opened))
+        self.assertEqual(unpickled.data, [(0, 1), (1.5, 2), (3, -4)])
+        self.assertEqual(unpickled.eval_points([4, 1]), [-4, 1])
+
+    def test_typecodes(self):
+        storage.save(DiscreteSeries([(0, 0.5), (1, 1)]), self.path)
+        self.assertEqual(storage.open(self.path)[1], 1.0)
+
+        storage.save(DiscreteSeries([(0, 1), (1, 2)]), self.path, 'b')
+        self.assertEqual(storage.open(self.path)[0.5], 1)
+
+        self.assertRaises(TypeError, lambda: storage.save(DiscreteSeries([(0, 'a')]),
+                                                          self.path))
+        self.assertRaises(ValueError, lambda: storage.save(DiscreteSeries([(0, 1)]),
+                                                           self.path, 'x'))
+
+        for data, typecode in (([(0, True)], None), ([(0, 2 ** 64)], None), ([(0, 300)], 'b')):
+            self.assertRaises(TypeError, lambda: storage.save(DiscreteSeries(data), self.path,
+                                                              typecode))
+
+    def test_empty_and_invalid(self):
+        storage.save(DiscreteSeries([]), self.path)
+        self.assertTrue(storage.open(self.path).domain.is_empty())
+
+        with open(self.path, 'wb') as f:
+            f.write(b'not a series at all, really not a series')
+        self.assertRaises(ValueError, lambda: storage.open(self.path))
+
+    @unittest.skipIf(np is None, 'numpy not installed')
+    def test_as_array(self):
+        storage.save(DiscreteSeries([(0, 1), (1, 2)], '<0;2)'), self.path)
+
+        opened = storage.open(self.path, as_array=True)
+        self.assertIsInstance(opened, ArrayDiscreteSeries)
+        self.assertEqual(opened.values.dtype, np.int64)
+        self.assertEqual(opened[1.5], 2)